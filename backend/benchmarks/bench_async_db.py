@@ -0,0 +1,96 @@
+"""Compare throughput of the sync and async database stacks side by side.
+
+Usage:
+    uv sync --extra async
+    uv run python benchmarks/bench_async_db.py [--requests 500] [--concurrency 50]
+
+Seeds a throwaway SQLite database (set DATABASE_URL to benchmark PostgreSQL),
+then issues the same concurrent balance and expense history reads against
+the sync API (/api/v1) and the async API (/api/async/v1) of one app instance.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# Configure the app before it is imported
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench_async.db")
+os.environ["ASYNC_DATABASE_ENABLED"] = "true"
+
+import httpx  # noqa: E402
+
+from app.auth import create_access_token  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.ledger import rebuild_ledger  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Expense, Group, GroupMember, User  # noqa: E402
+
+
+def seed(members: int, expenses: int) -> int:
+    """Create one group with members and expenses; return its id."""
+    db = SessionLocal()
+    try:
+        users = [
+            User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="x")
+            for i in range(members)
+        ]
+        db.add_all(users)
+        db.flush()
+        group = Group(name="Benchmark", created_by_user_id=users[0].id)
+        db.add(group)
+        db.flush()
+        db.add_all(GroupMember(group_id=group.id, user_id=user.id) for user in users)
+        db.add_all(
+            Expense(group_id=group.id, paid_by_user_id=users[i % members].id, amount=10.0 + i % 7)
+            for i in range(expenses)
+        )
+        db.commit()
+        rebuild_ledger(db, group.id)
+        return group.id
+    finally:
+        db.close()
+
+
+async def hammer(client, paths, total: int, concurrency: int) -> float:
+    """Issue `total` GETs cycling through `paths`; return requests per second."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            response = await client.get(paths[i % len(paths)])
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def run(total: int, concurrency: int):
+    group_id = seed(members=10, expenses=2_000)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        for label, prefix in (("sync", settings.api_v1_prefix), ("async", settings.async_api_prefix)):
+            paths = [
+                f"{prefix}/expenses/group/{group_id}/balance",
+                f"{prefix}/expenses/group/{group_id}?limit=50",
+                f"{prefix}/groups/{group_id}",
+            ]
+            await hammer(client, paths, concurrency, concurrency)  # warm up
+            rate = await hammer(client, paths, total, concurrency)
+            print(f"{label:>5}: {rate:8.1f} req/s ({total} requests, concurrency {concurrency})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
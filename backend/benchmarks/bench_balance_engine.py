@@ -0,0 +1,148 @@
+"""Compare the SQL and NumPy balance engines with a plain Python loop.
+
+Usage:
+    uv sync --extra analytics
+    uv run python benchmarks/bench_balance_engine.py [--sizes 10000 100000 1000000] [--members 4]
+
+For each size, seeds a throwaway SQLite database (set DATABASE_URL to
+benchmark PostgreSQL) with one group and that many expenses, each split
+equally among the members. It then times recomputing the group's balances
+from rows already in memory (a Python loop, as the original balance
+endpoint did, vs NumPy) and from the database (the SQL aggregation vs the
+NumPy engine, including loading the rows). All results are checked to be
+identical.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+# Configure the app before it is imported
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench_engine.db")
+
+import numpy as np  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.balance_engine import balance_totals  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.ledger import aggregate_balances  # noqa: E402
+from app.models import Expense, ExpenseShare, Group, GroupMember, User  # noqa: E402
+from app.money import split_cents  # noqa: E402
+
+
+def seed(db, expenses: int, members: int) -> int:
+    """Create one group with members and equally split expenses; return its id."""
+    rng = random.Random(expenses)
+    users = [
+        User(email=f"user{i}-{expenses}@example.com", username=f"user{i}-{expenses}", hashed_password="x")
+        for i in range(members)
+    ]
+    db.add_all(users)
+    db.flush()
+    group = Group(name=f"Benchmark {expenses}", created_by_user_id=users[0].id)
+    db.add(group)
+    db.flush()
+    db.add_all(GroupMember(group_id=group.id, user_id=user.id) for user in users)
+    db.flush()
+
+    user_ids = [user.id for user in users]
+    amounts = [rng.randint(1, 100_000) for _ in range(expenses)]
+    expense_ids = db.scalars(
+        insert(Expense).returning(Expense.id, sort_by_parameter_order=True),
+        [
+            {"group_id": group.id, "paid_by_user_id": user_ids[i % members], "amount_cents": amount}
+            for i, amount in enumerate(amounts)
+        ],
+    ).all()
+    db.execute(
+        insert(ExpenseShare),
+        [
+            {"expense_id": expense_id, "user_id": user_id, "share_cents": share}
+            for expense_id, amount in zip(expense_ids, amounts)
+            for user_id, share in zip(user_ids, split_cents(amount, members))
+        ],
+    )
+    db.commit()
+    return group.id
+
+
+def load_rows(db, group_id: int):
+    """Load the group's member, payment and share rows as tuples."""
+    members = db.execute(
+        select(GroupMember.group_id, GroupMember.user_id)
+        .where(GroupMember.group_id == group_id)
+        .order_by(GroupMember.id)
+    ).all()
+    payments = db.execute(
+        select(Expense.group_id, Expense.paid_by_user_id, Expense.amount_cents)
+        .where(Expense.group_id == group_id)
+    ).all()
+    shares = db.execute(
+        select(Expense.group_id, ExpenseShare.user_id, ExpenseShare.share_cents)
+        .join(Expense, Expense.id == ExpenseShare.expense_id)
+        .where(Expense.group_id == group_id)
+    ).all()
+    return [tuple(row) for row in members], [tuple(row) for row in payments], [tuple(row) for row in shares]
+
+
+def python_loop(members, payments, shares) -> dict:
+    """Total the rows in a Python loop, as the original balance endpoint did."""
+    paid = defaultdict(int)
+    share = defaultdict(int)
+    for group_id, user_id, cents in payments:
+        paid[(group_id, user_id)] += cents
+    for group_id, user_id, cents in shares:
+        share[(group_id, user_id)] += cents
+    return {key: (paid[key], share[key]) for key in members}
+
+
+def as_arrays(members, payments, shares):
+    """Convert loaded rows into the arrays the vectorised engine works on."""
+    return (
+        np.array(members, dtype=np.int64).reshape(-1, 2),
+        np.array(payments, dtype=np.int64).reshape(-1, 3),
+        np.array(shares, dtype=np.int64).reshape(-1, 3),
+    )
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--members", type=int, default=4)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    print("seconds to recompute one group's balances")
+    print(f"{'':>10} {'in memory':>22} {'from the database':>22}")
+    print(f"{'expenses':>10} {'python':>10} {'numpy':>11} {'sql':>10} {'numpy':>11}")
+    for size in args.sizes:
+        db = SessionLocal()
+        try:
+            group_id = seed(db, size, args.members)
+            rows = load_rows(db, group_id)
+            arrays = as_arrays(*rows)
+            expected, python_seconds = timed(python_loop, *rows)
+            (paid, share), in_memory_seconds = timed(balance_totals, *arrays)
+            in_memory = dict(zip(rows[0], zip(paid.tolist(), share.tolist())))
+            sql_result, sql_seconds = timed(aggregate_balances, db, group_id)
+            numpy_result, numpy_seconds = timed(aggregate_balances, db, group_id, "numpy")
+            assert in_memory == sql_result == numpy_result == expected
+            print(
+                f"{size:>10} {python_seconds:>10.3f} {in_memory_seconds:>11.3f} "
+                f"{sql_seconds:>10.3f} {numpy_seconds:>11.3f}"
+            )
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare adding expenses one request at a time with the batch endpoint.
+
+Usage:
+    uv run python benchmarks/bench_batch_expenses.py [--sizes 100 1000 5000]
+
+Seeds a throwaway SQLite database (set DATABASE_URL to benchmark PostgreSQL)
+with one group, then adds the same expenses through POST /expenses and
+through POST /expenses/batch, reporting expenses per second for each.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# Configure the app before it is imported
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench_batch.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.auth import create_access_token  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.ledger import record_member  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Group, GroupMember, User  # noqa: E402
+
+
+def seed(members: int) -> tuple:
+    """Create one group with members; return its id and the member ids."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        users = [
+            User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="x")
+            for i in range(members)
+        ]
+        db.add_all(users)
+        db.flush()
+        group = Group(name="Benchmark", created_by_user_id=users[0].id)
+        db.add(group)
+        db.flush()
+        for user in users:
+            db.add(GroupMember(group_id=group.id, user_id=user.id))
+            record_member(db, group.id, user.id)
+        db.commit()
+        return group.id, [user.id for user in users]
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 5_000])
+    parser.add_argument("--members", type=int, default=10)
+    args = parser.parse_args()
+
+    group_id, member_ids = seed(args.members)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(member_ids[0])})}"}
+    prefix = settings.api_v1_prefix
+
+    print(f"{'expenses':>10} {'single/s':>12} {'batch/s':>12} {'speedup':>9}")
+    with TestClient(app) as client:
+        for size in args.sizes:
+            expenses = [
+                {"paid_by_user_id": member_ids[i % len(member_ids)], "amount": 10.0 + i % 7}
+                for i in range(size)
+            ]
+
+            start = time.perf_counter()
+            for expense in expenses:
+                response = client.post(
+                    f"{prefix}/expenses", headers=headers, json={"group_id": group_id, **expense}
+                )
+                response.raise_for_status()
+            single = size / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            response = client.post(
+                f"{prefix}/expenses/batch",
+                headers=headers,
+                json={"group_id": group_id, "expenses": expenses},
+            )
+            response.raise_for_status()
+            batch = size / (time.perf_counter() - start)
+
+            print(f"{size:>10} {single:>12.0f} {batch:>12.0f} {batch / single:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
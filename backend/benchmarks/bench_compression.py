@@ -0,0 +1,96 @@
+"""Measure bytes saved and CPU cost of response compression at several payload sizes.
+
+Usage:
+    uv run python benchmarks/bench_compression.py [--rows 10 100 1000 10000]
+
+Encodes an expense history of each size as the API does (JSON, and NDJSON
+streamed in chunks of STREAM_BATCH_SIZE rows with a flush after each
+chunk), then compresses it with every available encoding at the levels
+configured in Settings. brotli and zstd are skipped unless installed
+(`uv sync --extra speedups`). CPU time is the median over --repeat runs.
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app.compression import available_compressors
+from app.config import settings
+from app.routers.expenses import STREAM_BATCH_SIZE, expense_history, ndjson_lines
+from app.serialization import dumps
+
+MEMBERS = 4
+
+LEVELS = {
+    "gzip": settings.compression_gzip_level,
+    "br": settings.compression_brotli_quality,
+    "zstd": settings.compression_zstd_level,
+}
+
+
+def history_rows(count: int) -> list:
+    """Build rows shaped like EXPENSE_ROW_COLUMNS for a four-member group."""
+    start = datetime(2024, 1, 1)
+    return [
+        (
+            i + 1, 1, i % MEMBERS + 1, 1000 + i * 37 % 9973, f"Expense {i + 1}", None,
+            start + timedelta(minutes=i), f"user{i % MEMBERS}@example.com",
+            f"user{i % MEMBERS}", f"User {i % MEMBERS}", True, start,
+        )
+        for i in range(count)
+    ]
+
+
+def compress(factory, level: int, chunks: list) -> bytes:
+    """Compress chunks as the middleware does, flushing between chunks of a stream."""
+    compressor = factory(level)
+    output = []
+    for chunk in chunks[:-1]:
+        output.append(compressor.compress(chunk) + compressor.flush())
+    output.append(compressor.compress(chunks[-1]) + compressor.finish())
+    return b"".join(output)
+
+
+def measure(factory, level: int, chunks: list, repeat: int) -> tuple:
+    """Compressed size and median CPU seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        body = compress(factory, level, chunks)
+        timings.append(time.process_time() - start)
+    return len(body), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    compressors = available_compressors()
+    print(
+        f"{'rows':>7} {'shape':>7} {'encoding':>9} {'bytes':>10} {'compressed':>11} "
+        f"{'saved':>7} {'CPU ms':>8} {'MB/s':>8}"
+    )
+    for count in args.rows:
+        rows = history_rows(count)
+        shapes = {
+            "json": [dumps(expense_history(rows))],
+            "ndjson": [
+                ndjson_lines(rows[i:i + STREAM_BATCH_SIZE])
+                for i in range(0, count, STREAM_BATCH_SIZE)
+            ],
+        }
+        for shape, chunks in shapes.items():
+            size = sum(len(chunk) for chunk in chunks)
+            for encoding, factory in compressors.items():
+                compressed, seconds = measure(factory, LEVELS[encoding], chunks, args.repeat)
+                throughput = size / seconds / 1e6 if seconds else float("inf")
+                print(
+                    f"{count:>7} {shape:>7} {encoding:>9} {size:>10} {compressed:>11} "
+                    f"{1 - compressed / size:>6.0%} {seconds * 1000:>8.2f} {throughput:>8.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
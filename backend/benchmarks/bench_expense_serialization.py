@@ -0,0 +1,166 @@
+"""Compare encoding expense history through Pydantic models with the row-tuple path.
+
+Usage:
+    uv run python benchmarks/bench_expense_serialization.py [--sizes 1000 10000 50000]
+
+Seeds a throwaway SQLite database (set DATABASE_URL to benchmark PostgreSQL)
+with one four-member group, then builds the JSON body of
+GET /expenses/group/{id} in several ways:
+
+- models: ORM expenses with their payers, one ExpenseResponse each,
+  validated again as List[ExpenseResponse] and encoded with JSONResponse,
+  as the route did before
+- rows/json: row tuples turned into dicts, encoded with the stdlib fallback
+- rows/orjson: the same dicts encoded with orjson (skipped if not installed)
+- compact/json, compact/orjson: the ?compact=true shape, with each payer
+  listed once instead of embedded in every expense
+
+Reports the median time over --repeat runs, the peak memory traced by
+tracemalloc and the body size, per 10k rows.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+
+# Configure the app before it is imported
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench_serialization.db")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app import serialization  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Expense, Group, GroupMember, User  # noqa: E402
+from app.routers.expenses import (  # noqa: E402
+    expense_history,
+    expense_history_statement,
+    expense_response,
+)
+from app.schemas import ExpenseResponse  # noqa: E402
+
+MEMBERS = 4
+
+
+def seed(size: int) -> int:
+    """Create a group with `size` expenses; return its id."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        users = [
+            User(email=f"user{i}@example.com", username=f"user{i}", full_name=f"User {i}", hashed_password="x")
+            for i in range(MEMBERS)
+        ]
+        db.add_all(users)
+        db.flush()
+        group = Group(name="Benchmark", created_by_user_id=users[0].id)
+        db.add(group)
+        db.flush()
+        db.add_all(GroupMember(group_id=group.id, user_id=user.id) for user in users)
+        start = datetime(2024, 1, 1)
+        db.execute(insert(Expense), [
+            {
+                "group_id": group.id,
+                "paid_by_user_id": users[i % MEMBERS].id,
+                "amount_cents": 1000 + i % 997,
+                "description": f"Expense {i}",
+                "created_at": start + timedelta(seconds=i),
+            }
+            for i in range(size)
+        ])
+        db.commit()
+        return group.id
+    finally:
+        db.close()
+
+
+def encode_models(group_id: int) -> bytes:
+    db = SessionLocal()
+    try:
+        statement = (
+            select(Expense)
+            .options(joinedload(Expense.paid_by_user))
+            .where(Expense.group_id == group_id)
+            .order_by(Expense.created_at.desc(), Expense.id.desc())
+        )
+        items = [expense_response(expense) for expense in db.scalars(statement)]
+        adapter = TypeAdapter(List[ExpenseResponse])
+        validated = adapter.validate_python(items, from_attributes=True)
+        return JSONResponse(adapter.dump_python(validated, mode="json")).body
+    finally:
+        db.close()
+
+
+def encode_rows(group_id: int, compact: bool = False) -> bytes:
+    db = SessionLocal()
+    try:
+        rows = db.execute(expense_history_statement(group_id))
+        return serialization.dumps(expense_history(rows, compact))
+    finally:
+        db.close()
+
+
+def encode_compact(group_id: int) -> bytes:
+    return encode_rows(group_id, compact=True)
+
+
+def measure(encode, group_id: int, repeat: int) -> tuple:
+    """Median seconds, tracemalloc peak bytes and body bytes for one encoding."""
+    body = encode(group_id)  # Also warms up statement caches
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode(group_id)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    encode(group_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    orjson = serialization.orjson
+    modes = [
+        ("models", encode_models, orjson),
+        ("rows/json", encode_rows, None),
+        ("compact/json", encode_compact, None),
+    ]
+    if orjson is not None:
+        modes += [("rows/orjson", encode_rows, orjson), ("compact/orjson", encode_compact, orjson)]
+
+    print(
+        f"{'rows':>8} {'mode':>15} {'ms/10k':>10} {'peak MiB/10k':>13} "
+        f"{'body KiB/10k':>13} {'speedup':>9}"
+    )
+    for size in args.sizes:
+        group_id = seed(size)
+        baseline = None
+        for name, encode, encoder in modes:
+            serialization.orjson = encoder
+            seconds, peak, body = measure(encode, group_id, args.repeat)
+            baseline = baseline or seconds
+            scale = 10_000 / size
+            print(
+                f"{size:>8} {name:>15} {seconds * scale * 1000:>10.1f} "
+                f"{peak * scale / 2**20:>13.1f} {body * scale / 1024:>13.0f} "
+                f"{baseline / seconds:>8.1f}x"
+            )
+        serialization.orjson = orjson
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark login throughput and tail latency under concurrency.
+
+Usage:
+    uv run python benchmarks/bench_login.py [--requests 200] [--concurrency 50]
+
+Fires concurrent logins at the app in-process while probing /health, and
+reports login throughput, latency percentiles, 503 rejections and how long
+the health probe waited. Tune BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS and
+PASSWORD_HASH_MAX_PENDING through the environment to compare settings.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+# Point the app at a throwaway database before it is imported
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench_login.db")
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+EMAIL = "bench@example.com"
+PASSWORD = "benchpassword123"
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of a list of numbers."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(total: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post(
+            "/api/v1/auth/signup",
+            json={"email": EMAIL, "username": "benchuser", "password": PASSWORD},
+        )
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, statuses = [], []
+        probe_latencies = []
+        done = asyncio.Event()
+
+        async def login():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD}
+                )
+                latencies.append(time.perf_counter() - start)
+                statuses.append(response.status_code)
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    ok = [lat for lat, code in zip(latencies, statuses) if code == 200]
+    rejected = statuses.count(503)
+    print(f"logins: {total} at concurrency {concurrency} in {elapsed:.2f}s")
+    print(f"  successful: {len(ok)} ({len(ok) / elapsed:.1f}/s), rejected with 503: {rejected}")
+    if ok:
+        print(
+            f"  latency p50={percentile(ok, 50) * 1000:.0f}ms "
+            f"p95={percentile(ok, 95) * 1000:.0f}ms p99={percentile(ok, 99) * 1000:.0f}ms"
+        )
+    if probe_latencies:
+        print(
+            f"/health during storm: p50={statistics.median(probe_latencies) * 1000:.1f}ms "
+            f"max={max(probe_latencies) * 1000:.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark settlement planning on large groups.
+
+Usage:
+    uv run python benchmarks/bench_settlements.py [--sizes 1000 10000 100000]
+
+Reports the time to plan settlements for random balances and the time per
+n*log2(n), which should stay roughly flat if planning is O(n log n).
+"""
+import argparse
+import math
+import random
+import time
+
+from app.settlement import exact_settlements, greedy_settlements, EXACT_MAX_PARTICIPANTS
+
+
+def random_balances(size: int, seed: int = 0) -> dict:
+    """Generate net balances in cents that sum to zero."""
+    rng = random.Random(seed)
+    balances = {user_id: rng.randint(-100_000, 100_000) for user_id in range(1, size)}
+    balances[size] = -sum(balances.values())
+    return balances
+
+
+def best_time(fn, balances, repeat: int) -> float:
+    """Return the fastest of several runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(balances)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'members':>10} {'transfers':>10} {'seconds':>10} {'ns/(n log n)':>14}")
+    for size in args.sizes:
+        balances = random_balances(size)
+        elapsed = best_time(greedy_settlements, balances, args.repeat)
+        transfers = len(greedy_settlements(balances))
+        per_op = elapsed / (size * math.log2(size)) * 1e9
+        print(f"{size:>10} {transfers:>10} {elapsed:>10.4f} {per_op:>14.1f}")
+
+    balances = random_balances(EXACT_MAX_PARTICIPANTS)
+    elapsed = best_time(exact_settlements, balances, args.repeat)
+    print(
+        f"\nexact mode, {EXACT_MAX_PARTICIPANTS} members: {elapsed:.4f}s, "
+        f"{len(exact_settlements(balances))} transfers "
+        f"(greedy: {len(greedy_settlements(balances))})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Concurrent expense writes and reads against SQLite under different profiles.
+
+Usage:
+    uv run python benchmarks/bench_sqlite_concurrency.py [--writes 300] [--reads 300] [--concurrency 16]
+
+Runs the same workload once per SQLite profile, each in a fresh process with
+its own database file: concurrent POST /expenses calls mixed with history
+and balance reads, all in-process through httpx. Reports throughput,
+latency percentiles and failed requests ("database is locked" surfaces as
+a 500). Profiles:
+
+- legacy: rollback journal, synchronous=FULL, deferred BEGIN (the old setup)
+- wal: the tuned pragmas, but write requests still use a deferred BEGIN
+- tuned: the tuned pragmas with BEGIN IMMEDIATE for write requests (default)
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROFILES = {
+    "legacy": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_CACHE_SIZE_KIB": "2000",
+        "SQLITE_MMAP_SIZE_BYTES": "0",
+        "SQLITE_TEMP_STORE": "DEFAULT",
+        "SQLITE_IMMEDIATE_WRITES": "false",
+    },
+    "wal": {"SQLITE_IMMEDIATE_WRITES": "false"},
+    "tuned": {},
+}
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of a list of numbers."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(writes: int, reads: int, concurrency: int) -> None:
+    """Run the workload against the app configured by the environment."""
+    import httpx
+
+    from app.auth import create_access_token
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        members = []
+        for i in range(4):
+            response = await client.post("/api/v1/auth/signup", json={
+                "email": f"user{i}@example.com", "username": f"user{i}", "password": "benchpassword123",
+            })
+            members.append(response.json()["id"])
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(members[0])})}"}
+        group_id = (await client.post("/api/v1/groups", headers=headers, json={"name": "Bench"})).json()["id"]
+        await client.post(
+            f"/api/v1/groups/{group_id}/members/bulk",
+            headers=headers,
+            json={"emails": [f"user{i}@example.com" for i in range(1, 4)]},
+        )
+
+        semaphore = asyncio.Semaphore(concurrency)
+        results = {"write": [], "read": []}
+
+        async def request(kind, method, url, **kwargs):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.request(method, url, headers=headers, **kwargs)
+                results[kind].append((time.perf_counter() - start, response.status_code))
+
+        # Interleave writes and reads
+        tasks = []
+        for i in range(max(writes, reads)):
+            if i < writes:
+                tasks.append(request("write", "POST", "/api/v1/expenses", json={
+                    "group_id": group_id, "paid_by_user_id": members[i % 4], "amount": 10.0 + i % 13,
+                }))
+            if i < reads:
+                path = f"/api/v1/expenses/group/{group_id}" + ("/balance" if i % 2 else "")
+                tasks.append(request("read", "GET", path))
+        start = time.perf_counter()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    for kind, outcomes in results.items():
+        ok = [latency for latency, code in outcomes if code < 400]
+        failed = len(outcomes) - len(ok)
+        p50 = percentile(ok, 50) * 1000 if ok else float("nan")
+        p95 = percentile(ok, 95) * 1000 if ok else float("nan")
+        print(
+            f"{os.environ['BENCH_PROFILE']:>8} {kind:>6} {len(ok) / elapsed:>9.1f} "
+            f"{p50:>9.1f} {p95:>9.1f} {failed:>7}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writes", type=int, default=300)
+    parser.add_argument("--reads", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(run(args.writes, args.reads, args.concurrency))
+        return
+
+    print(f"{'profile':>8} {'kind':>6} {'ok/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'failed':>7}")
+    for profile in args.profiles:
+        db_dir = tempfile.mkdtemp()
+        env = {
+            **os.environ,
+            **PROFILES[profile],
+            "BENCH_PROFILE": profile,
+            "DATABASE_URL": f"sqlite:///{db_dir}/bench_concurrency.db",
+            "BCRYPT_ROUNDS": "4",
+        }
+        subprocess.run(
+            [
+                sys.executable, __file__, "--worker",
+                "--writes", str(args.writes),
+                "--reads", str(args.reads),
+                "--concurrency", str(args.concurrency),
+            ],
+            env=env,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,18 +4,43 @@ from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
 
+from app.cache import TTLCache
 from app.config import settings
 from app.database import get_db
 from app.models import User
+from app.password_hashing import PasswordHashPool, PasswordHashPoolSaturated
 from app.schemas import TokenData
 
 # HTTPBearer for simple token input in Swagger UI
 # This shows a simple "Value" field where you can paste your token
 http_bearer = HTTPBearer(auto_error=False)
 
+# Column values of recently authenticated users, keyed by user id.
+# Entries are dropped whenever the user row is updated or deleted in this
+# process, at flush and again at commit; the TTL bounds staleness for
+# changes made by other processes.
+principal_cache = TTLCache(
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl_seconds,
+)
+
+# Session.info key for ids of users changed in the session's transaction
+_CHANGED_PRINCIPALS_KEY = "changed_principal_ids"
+
+# Never keep password hashes in memory longer than a request
+_PRINCIPAL_EXCLUDED_COLUMNS = {"hashed_password"}
+
+# Dedicated threads for bcrypt, so login bursts cannot starve other requests
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
+
 
 def _truncate_password_bytes(password: str) -> bytes:
     """Truncate password to 72 bytes (bcrypt limit)."""
@@ -38,11 +63,33 @@ def get_password_hash(password: str) -> str:
     # Bcrypt has a 72-byte limit, so we truncate if necessary
     password_bytes = _truncate_password_bytes(password)
     # Generate salt and hash
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
 
+async def _run_on_hash_pool(fn, *args):
+    """Run a hashing call on the password hash pool, or fail fast with 503 when it is full."""
+    try:
+        return await password_hash_pool.run(fn, *args)
+    except PasswordHashPoolSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": str(settings.password_hash_retry_after_seconds)},
+        )
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash on the password hash pool."""
+    return await _run_on_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the password hash pool."""
+    return await _run_on_hash_pool(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -65,11 +112,20 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     return user
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user."""
+async def authenticate_user_async(db: Session, email: str, password: str) -> Optional[User]:
+    """Authenticate a user by email and password, hashing on the password hash pool."""
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == email).first()
+    )
+    if not user:
+        return None
+    if not await verify_password_async(password, user.hashed_password):
+        return None
+    return user
+
+
+def get_token_user_id(credentials: Optional[HTTPAuthorizationCredentials]) -> int:
+    """Get the user id from a bearer token, or raise 401 if the token is invalid."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -89,12 +145,77 @@ async def get_current_user(
         token_data = TokenData(user_id=user_id)
     except (JWTError, ValueError):
         raise credentials_exception
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    return token_data.user_id
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get the current authenticated user."""
+    user = load_principal(db, get_token_user_id(credentials))
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
+def load_principal(db: Session, user_id: int) -> Optional[User]:
+    """
+    Get the user for an authenticated request, from the principal cache when possible.
+
+    Cached users are attached to the session without a query, so routes can
+    use and modify them like any other loaded user.
+    """
+    if not settings.principal_cache_enabled:
+        return db.query(User).filter(User.id == user_id).first()
+
+    snapshot = principal_cache.get(user_id)
+    if snapshot is not None:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        principal_cache.set(user_id, {
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(User).column_attrs
+            if attr.key not in _PRINCIPAL_EXCLUDED_COLUMNS
+        })
+    return user
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    """Drop a user from the principal cache when their row changes."""
+    principal_cache.delete(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_PRINCIPALS_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session):
+    """
+    Drop changed users again once the change is committed.
+
+    Until COMMIT, other requests still read the old row, and one that
+    missed the cache after the flush may have cached it again.
+    """
+    for user_id in session.info.pop(_CHANGED_PRINCIPALS_KEY, ()):
+        principal_cache.delete(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_principals(session):
+    session.info.pop(_CHANGED_PRINCIPALS_KEY, None)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -0,0 +1,59 @@
+"""Cache of group balance summaries, keyed by group id and group version.
+
+Entries store the ``Group.version`` they were computed at, so a summary is
+only served while the group is unchanged; writes also drop the entry so
+the space is reclaimed straight away. The backend is chosen with
+``BALANCE_CACHE_BACKEND``:
+
+- ``memory``: an LRU cache in each worker process (the default)
+- ``sqlite``: a SQLite file shared by all worker processes on the host
+- ``none``: caching disabled
+"""
+from typing import Optional, Union
+
+from app.cache import SQLiteCache, TTLCache
+from app.config import settings
+from app.models import Group
+from app.schemas import GroupBalanceSummary
+
+
+def _create_cache() -> Union[TTLCache, SQLiteCache]:
+    backend = settings.balance_cache_backend
+    if backend == "memory":
+        return TTLCache(
+            maxsize=settings.balance_cache_size,
+            ttl=settings.balance_cache_ttl_seconds,
+        )
+    if backend == "sqlite":
+        return SQLiteCache(
+            settings.balance_cache_path,
+            maxsize=settings.balance_cache_size,
+            ttl=settings.balance_cache_ttl_seconds,
+        )
+    if backend == "none":
+        return TTLCache(maxsize=0, ttl=0)
+    raise ValueError(f"Unknown balance cache backend: {backend!r}")
+
+
+balance_cache = _create_cache()
+
+
+def get_cached_balance_summary(group: Group) -> Optional[GroupBalanceSummary]:
+    """Get the cached summary for the group's current version, if any."""
+    entry = balance_cache.get(group.id)
+    if entry is None or entry["version"] != group.version:
+        return None
+    return GroupBalanceSummary.model_validate(entry["summary"])
+
+
+def cache_balance_summary(group: Group, summary: GroupBalanceSummary) -> None:
+    """Store a summary computed at the group's current version."""
+    balance_cache.set(group.id, {
+        "version": group.version,
+        "summary": summary.model_dump(mode="json"),
+    })
+
+
+def invalidate_group_balances(group_id: int) -> None:
+    """Drop the cached summary of a group after a write to it."""
+    balance_cache.delete(group_id)
@@ -0,0 +1,83 @@
+"""Vectorised balance computation for analytics and large recomputations.
+
+Loads payments and expense shares into NumPy arrays and totals them per
+member in int64, producing exactly the same (paid_cents, share_cents) values
+as ``app.ledger.aggregate_balances``. Requires the ``analytics``
+extra (``uv sync --extra analytics``).
+"""
+from itertools import chain
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Expense, ExpenseShare, GroupMember
+
+# Keys pack (group_id, user_id) into one int64, so user ids must fit in 32 bits
+_USER_ID_BITS = 32
+
+
+def _pack(group_ids: np.ndarray, user_ids: np.ndarray) -> np.ndarray:
+    return (group_ids << _USER_ID_BITS) | user_ids
+
+
+def _load(db: Session, statement, columns: int) -> np.ndarray:
+    """Run a statement and return its integer rows as an (n, columns) array."""
+    values = chain.from_iterable(db.connection().execute(statement))
+    return np.fromiter(values, dtype=np.int64).reshape(-1, columns)
+
+
+def balance_totals(
+    members: np.ndarray, payments: np.ndarray, shares: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Total paid and share cents for each member.
+
+    `members` holds (group_id, user_id) rows, `payments` (group_id,
+    paid_by_user_id, amount_cents) and `shares` (group_id, user_id,
+    share_cents). Returns two arrays aligned with `members`. Rows for users
+    who are not members of the group are ignored, as in the SQL aggregation.
+    """
+    keys = _pack(members[:, 0], members[:, 1])
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    def totals(rows: np.ndarray) -> np.ndarray:
+        if not len(rows) or not len(keys):
+            return np.zeros(len(keys), dtype=np.int64)
+        row_keys = _pack(rows[:, 0], rows[:, 1])
+        positions = np.minimum(np.searchsorted(sorted_keys, row_keys), len(keys) - 1)
+        is_member = sorted_keys[positions] == row_keys
+        # Accumulate in int64, so sums stay exact (bincount weights would be float64)
+        summed = np.zeros(len(keys), dtype=np.int64)
+        np.add.at(summed, order[positions[is_member]], rows[is_member, 2])
+        return summed
+
+    return totals(payments), totals(shares)
+
+
+def aggregate_balances_vectorized(
+    db: Session, group_id: Optional[int] = None
+) -> Dict[Tuple[int, int], Tuple[int, int]]:
+    """Compute (paid_cents, share_cents) per (group_id, user_id) with NumPy."""
+    members = select(GroupMember.group_id, GroupMember.user_id).order_by(
+        GroupMember.group_id, GroupMember.id
+    )
+    payments = select(Expense.group_id, Expense.paid_by_user_id, Expense.amount_cents)
+    shares = select(Expense.group_id, ExpenseShare.user_id, ExpenseShare.share_cents).join(
+        Expense, Expense.id == ExpenseShare.expense_id
+    )
+    if group_id is not None:
+        members = members.where(GroupMember.group_id == group_id)
+        payments = payments.where(Expense.group_id == group_id)
+        shares = shares.where(Expense.group_id == group_id)
+
+    member_rows = _load(db, members, 2)
+    paid, share = balance_totals(member_rows, _load(db, payments, 3), _load(db, shares, 3))
+    return {
+        (gid, user_id): (paid_cents, share_cents)
+        for (gid, user_id), paid_cents, share_cents in zip(
+            member_rows.tolist(), paid.tolist(), share.tolist()
+        )
+    }
@@ -0,0 +1,230 @@
+"""Response compression.
+
+``CompressionMiddleware`` compresses responses with the encoding the client
+prefers out of those available: gzip always, brotli (``br``) and ``zstd``
+when their packages are installed (``uv sync --extra speedups``). Complete
+responses below a minimum size are sent as they are. Streaming responses,
+such as NDJSON expense history, are compressed chunk by chunk and flushed
+after each chunk, so clients can decode every line as it arrives.
+"""
+import zlib
+from typing import Callable, Dict, Iterable, Optional, Protocol, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the installed extras
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the installed extras
+    zstandard = None
+
+# Default compression level of each encoding, chosen for speed on dynamic responses
+DEFAULT_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+
+# Content types that must not be compressed
+_EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+# Statuses that never have a body
+_BODILESS_STATUSES = {204, 304}
+
+
+class Compressor(Protocol):
+    """Incremental compressor for one response body."""
+
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        """Get all output so far, so the client can decode everything sent."""
+        ...
+
+    def finish(self) -> bytes:
+        """Get the remaining output and end the stream."""
+        ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_compressors() -> Dict[str, Callable[[int], Compressor]]:
+    """Get the compressor of each encoding whose package is installed."""
+    compressors = {"gzip": GzipCompressor}
+    if brotli is not None:
+        compressors["br"] = BrotliCompressor
+    if zstandard is not None:
+        compressors["zstd"] = ZstdCompressor
+    return compressors
+
+
+def choose_encoding(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """
+    Pick the first of `encodings` (in server preference order) that the
+    Accept-Encoding header allows, or None to send the response as is.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with gzip, brotli or zstd."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Iterable[str] = ("zstd", "br", "gzip"),
+        minimum_size: int = 1024,
+        levels: Optional[Dict[str, int]] = None,
+    ):
+        self.app = app
+        compressors = available_compressors()
+        # Encodings in preference order, skipping those that are not installed
+        self.encodings = [encoding for encoding in encodings if encoding in compressors]
+        self.compressors = compressors
+        self.minimum_size = minimum_size
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            # HEAD responses have no body to compress
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = choose_encoding(accept_encoding, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(
+            send,
+            encoding,
+            lambda: self.compressors[encoding](self.levels[encoding]),
+            self.minimum_size,
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Wraps `send` for one response, deciding on compression at the first body chunk."""
+
+    def __init__(
+        self, send: Send, encoding: str, compressor: Callable[[], Compressor], minimum_size: int
+    ):
+        self._send = send
+        self.encoding = encoding
+        self.create_compressor = compressor
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Headers depend on the body, so hold them until the first chunk
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            start_message, self.start_message = self.start_message, None
+            if self._should_compress(start_message, body, more_body):
+                self.compressor = self.create_compressor()
+                self._set_headers(start_message, more_body)
+                if not more_body:
+                    # The whole body is in this chunk, so Content-Length can be set exactly
+                    body = self.compressor.compress(body) + self.compressor.finish()
+                    MutableHeaders(raw=start_message["headers"])["Content-Length"] = str(len(body))
+                    await self._send(start_message)
+                    await self._send({"type": "http.response.body", "body": body})
+                    return
+            await self._send(start_message)
+
+        if self.compressor is None:
+            await self._send(message)
+            return
+        if more_body:
+            body = self.compressor.compress(body) + self.compressor.flush()
+        else:
+            body = self.compressor.compress(body) + self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def _should_compress(self, start_message: Message, body: bytes, more_body: bool) -> bool:
+        if start_message["status"] in _BODILESS_STATUSES or not (body or more_body):
+            return False
+        headers = Headers(raw=start_message["headers"])
+        if "content-encoding" in headers:
+            return False
+        if headers.get("content-type", "").startswith(_EXCLUDED_CONTENT_TYPES):
+            return False
+        # Streams are compressed whatever their size, which is not known up front
+        return more_body or len(body) >= self.minimum_size
+
+    def _set_headers(self, start_message: Message, more_body: bool) -> None:
+        headers = MutableHeaders(raw=start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body and "content-length" in headers:
+            del headers["Content-Length"]
+        # The compressed bytes differ from the identity representation, so a
+        # strong tag becomes weak; If-None-Match still matches it (app.etags)
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
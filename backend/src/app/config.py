@@ -1,4 +1,5 @@
 """Configuration settings for the application."""
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -8,11 +9,69 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./expense_settlement.db"
     
+    # Connection pool. Pre-ping tests a connection before it is handed out:
+    # "always" (one extra round trip per checkout), "idle" (only connections
+    # idle for longer than db_pool_pre_ping_idle_seconds) or "never".
+    # SQLite files use the pool sizes but are never pinged.
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 30.0  # Wait for a free connection before failing
+    db_pool_recycle_seconds: int = -1  # Replace connections older than this; -1 disables
+    db_pool_pre_ping: str = "idle"
+    db_pool_pre_ping_idle_seconds: float = 30.0
+    
+    # SQLite performance profile, applied to every new connection. With
+    # sqlite_immediate_writes, write requests start with BEGIN IMMEDIATE and
+    # queue for the write lock (up to the busy timeout) instead of failing
+    # with "database is locked"
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 16384  # Page cache per connection
+    sqlite_mmap_size_bytes: int = 268435456  # 256 MiB
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_immediate_writes: bool = True
+    
+    # Async database mode (opt-in): serves async routes under async_api_prefix
+    # next to the sync API. The async URL defaults to database_url with an
+    # async driver (aiosqlite for SQLite, asyncpg for PostgreSQL).
+    async_database_enabled: bool = False
+    async_database_url: Optional[str] = None
+    async_api_prefix: str = "/api/async/v1"
+    
     # JWT
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Password hashing
+    bcrypt_rounds: int = 12  # Cost factor; each +1 doubles hashing time
+    password_hash_workers: int = 4  # Hashes computed in parallel
+    password_hash_max_pending: int = 32  # Hashes allowed to wait before returning 503
+    password_hash_retry_after_seconds: int = 1
+    
+    # Authenticated principal cache (skips the user lookup on cache hits)
+    principal_cache_enabled: bool = True
+    principal_cache_size: int = 10000
+    principal_cache_ttl_seconds: float = 60.0
+    
+    # Group balance summary cache: "memory" (per process), "sqlite" (a file
+    # shared by the worker processes on a host) or "none"
+    balance_cache_backend: str = "memory"
+    balance_cache_size: int = 1000
+    balance_cache_ttl_seconds: float = 300.0
+    balance_cache_path: str = "./balance_cache.db"
+    
+    # Response compression: encodings in order of preference ("br" and "zstd"
+    # are skipped unless their packages are installed) and the smallest
+    # complete response worth compressing, in bytes
+    compression_enabled: bool = True
+    compression_encodings: str = "zstd,br,gzip"
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+    
     # API
     api_v1_prefix: str = "/api/v1"
     
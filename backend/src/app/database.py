@@ -1,27 +1,30 @@
 """Database configuration and session management."""
+from fastapi import Depends
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import settings
+from app.db_pool import configure_pool, pool_options
+from app.sqlite_profile import BEGIN_MODE_OPTION, configure_sqlite
 
-# Configure engine based on database type
+# Configure engine based on database type; pool settings come from Settings
 if "sqlite" in settings.database_url:
     connect_args = {"check_same_thread": False}
     engine = create_engine(
         settings.database_url,
         connect_args=connect_args,
         echo=False,
+        **pool_options(settings.database_url),
     )
+    configure_sqlite(engine)
 else:
-    # PostgreSQL connection pool settings
     engine = create_engine(
         settings.database_url,
-        pool_size=10,
-        max_overflow=20,
-        pool_pre_ping=True,  # Verify connections before using
         echo=False,
+        **pool_options(settings.database_url),
     )
+configure_pool(engine, settings.database_url)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -37,7 +40,22 @@ def get_db():
         db.close()
 
 
+def write_transaction(db: Session = Depends(get_db)) -> None:
+    """
+    Route dependency for requests that write: on SQLite the request's
+    transaction starts with BEGIN IMMEDIATE (see `app.sqlite_profile`).
+    
+    List it first in the route's `dependencies`, so the transaction has not
+    been started by an earlier read in the same request.
+    """
+    if not db.in_transaction():
+        db.connection(execution_options={BEGIN_MODE_OPTION: "IMMEDIATE"})
+
+
 def init_db():
-    """Initialize database tables."""
+    """Initialize database tables and upgrade existing ones."""
+    from app.migrations import apply_migrations
+
     Base.metadata.create_all(bind=engine)
+    apply_migrations(engine)
 
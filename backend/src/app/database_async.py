@@ -0,0 +1,69 @@
+"""Async database engine and session management (opt-in).
+
+Enabled with ``ASYNC_DATABASE_ENABLED=true``. Requires the ``async`` extra
+(aiosqlite for SQLite, asyncpg for PostgreSQL). The sync engine in
+``app.database`` is unaffected, so both stacks can serve side by side.
+"""
+from functools import lru_cache
+
+from fastapi import Depends
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.db_pool import configure_pool, pool_options
+from app.sqlite_profile import BEGIN_MODE_OPTION, configure_sqlite
+
+# Sync driver URL prefixes and their async equivalents
+_ASYNC_DRIVERS = {
+    "sqlite://": "sqlite+aiosqlite://",
+    "sqlite+pysqlite://": "sqlite+aiosqlite://",
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "postgres://": "postgresql+asyncpg://",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Translate a sync database URL to the matching async driver."""
+    for prefix, async_prefix in _ASYNC_DRIVERS.items():
+        if database_url.startswith(prefix):
+            return async_prefix + database_url[len(prefix):]
+    return database_url
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """Get the async engine, creating it on first use."""
+    database_url = settings.async_database_url or to_async_url(settings.database_url)
+    engine = create_async_engine(
+        database_url,
+        echo=False,
+        **pool_options(database_url, async_engine=True),
+    )
+    # Pool and connection events are registered on the underlying sync engine
+    configure_pool(engine.sync_engine, database_url)
+    if database_url.startswith("sqlite"):
+        configure_sqlite(engine.sync_engine)
+    return engine
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Get the async session factory bound to the async engine."""
+    # Objects stay usable after commit; lazy loads are not possible in async code
+    return async_sessionmaker(
+        get_async_engine(), class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+
+async def get_async_db():
+    """Dependency for getting an async database session."""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def write_transaction_async(db: AsyncSession = Depends(get_async_db)) -> None:
+    """Async counterpart of `app.database.write_transaction`."""
+    if not db.in_transaction():
+        await db.connection(execution_options={BEGIN_MODE_OPTION: "IMMEDIATE"})
@@ -0,0 +1,143 @@
+"""Connection pool configuration and instrumentation.
+
+Engines are built with ``InstrumentedQueuePool`` (or its asyncio variant),
+which counts checkouts and timeouts and measures how long requests wait for
+a connection, so the pool can be sized against the number of workers.
+Statistics are published at ``/metrics``.
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.config import settings
+
+PRE_PING_STRATEGIES = ("always", "idle", "never")
+
+
+class _PoolInstrumentation:
+    """Checkout counters shared by the instrumented pool classes."""
+
+    def _init_instrumentation(self) -> None:
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            # Includes opening a new connection when the pool has none idle
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the pool occupancy and checkout wait statistics."""
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "max_overflow": self._max_overflow,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6)
+                if self.checkouts else 0.0,
+            }
+
+
+class InstrumentedQueuePool(_PoolInstrumentation, QueuePool):
+    """QueuePool that records checkout waits and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_instrumentation()
+
+
+class InstrumentedAsyncAdaptedQueuePool(_PoolInstrumentation, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout waits and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_instrumentation()
+
+
+def pool_options(database_url: str, async_engine: bool = False) -> Dict[str, Any]:
+    """
+    Get the engine keyword arguments for the configured pool.
+
+    In-memory SQLite keeps SQLAlchemy's default pool, since every connection
+    would be a separate database. SQLite files never drop connections, so
+    they are not pre-pinged.
+    """
+    if database_url.startswith("sqlite") and ":memory:" in database_url:
+        return {}
+    if settings.db_pool_pre_ping not in PRE_PING_STRATEGIES:
+        raise ValueError(f"Unknown pool pre-ping strategy: {settings.db_pool_pre_ping!r}")
+    options = {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if async_engine else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+    }
+    if not database_url.startswith("sqlite"):
+        options["pool_pre_ping"] = settings.db_pool_pre_ping == "always"
+    return options
+
+
+def configure_pool(engine: Engine, database_url: str) -> None:
+    """Install pool event handlers that `pool_options` cannot express."""
+    if settings.db_pool_pre_ping == "idle" and not database_url.startswith("sqlite"):
+        ping_idle_connections(engine, settings.db_pool_pre_ping_idle_seconds)
+
+
+def ping_idle_connections(engine: Engine, idle_seconds: float) -> None:
+    """
+    Ping a connection on checkout only if it has been idle for `idle_seconds`.
+
+    Connections in steady use skip the extra round trip that `pool_pre_ping`
+    costs on every checkout; ones that sat idle long enough to be dropped by
+    the server or a proxy are checked and transparently replaced.
+    """
+    dialect = engine.dialect
+
+    @event.listens_for(engine, "checkin")
+    def record_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            alive = dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if not alive:
+            # The pool discards the connection and checks out a fresh one
+            raise exc.DisconnectionError("Idle connection failed the ping")
+
+
+def pool_stats(pool: Pool) -> Dict[str, Any]:
+    """Get statistics for a pool; uninstrumented pools only report their class."""
+    if isinstance(pool, _PoolInstrumentation):
+        return pool.stats()
+    return {"pool": type(pool).__name__}
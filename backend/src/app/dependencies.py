@@ -0,0 +1,69 @@
+"""Shared route dependencies."""
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_active_user
+from app.database import get_db
+from app.models import Group, GroupMember, User
+
+
+def group_membership_statement(group_id: int, user_id: int):
+    """Select a group together with the user's membership id (None if not a member)."""
+    return (
+        select(Group, GroupMember.id)
+        .outerjoin(
+            GroupMember,
+            and_(GroupMember.group_id == Group.id, GroupMember.user_id == user_id),
+        )
+        .where(Group.id == group_id)
+    )
+
+
+def group_from_membership_row(row) -> Group:
+    """Get the group from a membership row, raising 404 or 403 as appropriate."""
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Group not found"
+        )
+    group, member_id = row
+    if member_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You must be a member of this group"
+        )
+    return group
+
+
+def membership_cache(request: Request) -> dict:
+    """Get the per-request cache of resolved group memberships."""
+    cache = getattr(request.state, "group_memberships", None)
+    if cache is None:
+        cache = request.state.group_memberships = {}
+    return cache
+
+
+def resolve_group_membership(request: Request, db: Session, group_id: int, user: User) -> Group:
+    """
+    Get a group the user is a member of, checking both in a single query.
+
+    Raises 404 if the group does not exist and 403 if the user is not a member.
+    The result is cached on the request, so repeated checks are free.
+    """
+    cache = membership_cache(request)
+    key = (group_id, user.id)
+    if key not in cache:
+        row = db.execute(group_membership_statement(group_id, user.id)).first()
+        cache[key] = group_from_membership_row(row)
+    return cache[key]
+
+
+def get_member_group(
+    group_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+) -> Group:
+    """Dependency for the path's group, which the current user must be a member of."""
+    return resolve_group_membership(request, db, group_id, current_user)
@@ -0,0 +1,55 @@
+"""Route dependencies for the async database mode."""
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import get_token_user_id, http_bearer, load_principal
+from app.database_async import get_async_db
+from app.dependencies import group_from_membership_row, group_membership_statement, membership_cache
+from app.models import Group, User
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """Get the current authenticated user."""
+    user = await db.run_sync(load_principal, get_token_user_id(credentials))
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+async def get_current_active_user_async(
+    current_user: User = Depends(get_current_user_async),
+) -> User:
+    """Get the current active user."""
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+
+async def resolve_group_membership_async(
+    request: Request, db: AsyncSession, group_id: int, user: User
+) -> Group:
+    """Async version of `app.dependencies.resolve_group_membership`."""
+    cache = membership_cache(request)
+    key = (group_id, user.id)
+    if key not in cache:
+        row = (await db.execute(group_membership_statement(group_id, user.id))).first()
+        cache[key] = group_from_membership_row(row)
+    return cache[key]
+
+
+async def get_member_group_async(
+    group_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> Group:
+    """Dependency for the path's group, which the current user must be a member of."""
+    return await resolve_group_membership_async(request, db, group_id, current_user)
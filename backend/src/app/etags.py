@@ -0,0 +1,75 @@
+"""Per-group versions and the ETags derived from them.
+
+Every change that can alter a group read (a new expense, a new member, a
+member's profile) bumps ``Group.version`` in the same transaction. Group
+reads then send a strong ETag built from the version, and answer a
+matching ``If-None-Match`` with 304 using only the group row the membership
+check has already loaded.
+"""
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models import Group, GroupMember
+
+
+def bump_group_version(db: Session, group_id: int) -> None:
+    """Mark a group as changed. The caller is responsible for committing."""
+    bump_group_versions(db, [group_id])
+
+
+def bump_group_versions(db: Session, group_ids: Iterable[int]) -> None:
+    """Mark several groups as changed in one statement. The caller is responsible for committing."""
+    group_ids = list(group_ids)
+    if not group_ids:
+        return
+    db.execute(
+        update(Group)
+        .where(Group.id.in_(group_ids))
+        .values(version=Group.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bump_user_group_versions(db: Session, user_id: int) -> None:
+    """Mark every group the user belongs to as changed, e.g. after a profile update."""
+    db.execute(
+        update(Group)
+        .where(Group.id.in_(
+            db.query(GroupMember.group_id).filter(GroupMember.user_id == user_id).scalar_subquery()
+        ))
+        .values(version=Group.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def group_etag(group: Group, resource: str, request: Optional[Request] = None) -> str:
+    """
+    Build a strong ETag for a representation of a group resource.
+
+    Query parameters (page, cursor, format) select different representations
+    of the same resource, so they are folded into the tag.
+    """
+    tag = f"{group.id}-{group.version}-{resource}"
+    if request is not None and request.url.query:
+        tag += "-" + hashlib.blake2s(request.url.query.encode("utf-8"), digest_size=6).hexdigest()
+    return f'"{tag}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Get a 304 response if the client already has this version, otherwise None."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
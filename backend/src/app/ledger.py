@@ -0,0 +1,478 @@
+"""Per-member balance ledger maintenance.
+
+The ledger (``GroupBalance``) stores, for every member of a group, the total
+amount they paid and the total of their shares, in integer cents. It is
+updated in the same transaction as expense creation and membership changes,
+so balance reads are a single indexed lookup instead of a replay of the
+group's expense history.
+
+Run ``python -m app.ledger verify`` to detect drift and
+``python -m app.ledger rebuild`` to recompute the ledger from expense history.
+"""
+import argparse
+import sys
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import BigInteger, and_, bindparam, exists, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Expense, ExpenseShare, Group, GroupBalance, GroupMember
+from app.money import split_cents
+
+
+class LedgerDrift(NamedTuple):
+    """A ledger value that does not match the expense history."""
+    group_id: int
+    user_id: int
+    field: str
+    recorded: Optional[int]
+    expected: Optional[int]
+
+
+class LedgerEntry(NamedTuple):
+    """A member's totals in a group, in cents."""
+    user_id: int
+    paid_cents: int
+    share_cents: int
+
+
+class UserLedgerEntry(NamedTuple):
+    """A user's totals in one of their groups, in cents."""
+    group_id: int
+    group_name: str
+    paid_cents: int
+    share_cents: int
+
+
+class NewExpense(NamedTuple):
+    """An expense being added, with each participant's share in cents."""
+    expense_id: int
+    paid_by_user_id: int
+    amount_cents: int
+    shares: Dict[int, int]
+
+
+def _balance_query(group_id: Optional[int] = None):
+    """
+    Build one statement aggregating paid and share totals per group member, in cents.
+
+    Shares are read from ``ExpenseShare``, where they were fixed when each
+    expense was created, so nothing is re-split here. Uses only GROUP BY/SUM
+    and outer joins, so it runs unchanged on SQLite and PostgreSQL.
+    """
+    paid = select(
+        Expense.group_id,
+        Expense.paid_by_user_id,
+        func.sum(Expense.amount_cents).label("paid_cents"),
+    ).group_by(Expense.group_id, Expense.paid_by_user_id)
+    shares = (
+        select(
+            Expense.group_id,
+            ExpenseShare.user_id,
+            func.sum(ExpenseShare.share_cents).label("share_cents"),
+        )
+        .join(Expense, Expense.id == ExpenseShare.expense_id)
+        .group_by(Expense.group_id, ExpenseShare.user_id)
+    )
+    members = select(GroupMember.group_id, GroupMember.user_id, GroupMember.id)
+
+    if group_id is not None:
+        paid = paid.where(Expense.group_id == group_id)
+        shares = shares.where(Expense.group_id == group_id)
+        members = members.where(GroupMember.group_id == group_id)
+
+    paid = paid.subquery()
+    shares = shares.subquery()
+    members = members.subquery()
+
+    return (
+        select(
+            members.c.group_id,
+            members.c.user_id,
+            func.coalesce(paid.c.paid_cents, 0).label("paid_cents"),
+            func.coalesce(shares.c.share_cents, 0).label("share_cents"),
+        )
+        .outerjoin(
+            paid,
+            and_(
+                paid.c.group_id == members.c.group_id,
+                paid.c.paid_by_user_id == members.c.user_id,
+            ),
+        )
+        .outerjoin(
+            shares,
+            and_(
+                shares.c.group_id == members.c.group_id,
+                shares.c.user_id == members.c.user_id,
+            ),
+        )
+        .order_by(members.c.group_id, members.c.id)
+    )
+
+
+def aggregate_balances(
+    db: Session, group_id: Optional[int] = None, engine: str = "sql"
+) -> Dict[Tuple[int, int], Tuple[int, int]]:
+    """
+    Compute (paid_cents, share_cents) per (group_id, user_id).
+
+    The default ``sql`` engine aggregates in a single round trip; ``numpy``
+    totals the raw rows in memory (see ``app.balance_engine``).
+    """
+    if engine == "numpy":
+        from app.balance_engine import aggregate_balances_vectorized
+
+        return aggregate_balances_vectorized(db, group_id)
+    return {
+        (row.group_id, row.user_id): (int(row.paid_cents), int(row.share_cents))
+        for row in db.execute(_balance_query(group_id))
+    }
+
+
+def compute_group_balances(db: Session, group_id: int) -> Dict[int, Tuple[int, int]]:
+    """Recompute (paid_cents, share_cents) per member from the group's expense history."""
+    return {
+        user_id: totals
+        for (_, user_id), totals in aggregate_balances(db, group_id).items()
+    }
+
+
+def _present_member_shares(expenses: list, joined: list) -> Iterator[dict]:
+    """
+    Split each expense equally among the members present when it was created.
+
+    `expenses` are (id, amount_cents, created_at, paid_by_user_id) rows and
+    `joined` (joined_at, user_id) pairs of one group, both sorted by time.
+    A single sweep advances a running member count past every member who
+    joined before each expense, so no membership lookups are needed.
+    Expenses older than every membership are charged to their payer.
+    """
+    present = 0
+    for expense_id, amount_cents, created_at, paid_by_user_id in expenses:
+        while present < len(joined) and (created_at is None or joined[present][0] <= created_at):
+            present += 1
+        user_ids = [user_id for _, user_id in joined[:present]] or [paid_by_user_id]
+        for user_id, share_cents in zip(user_ids, split_cents(amount_cents, len(user_ids))):
+            yield {"expense_id": expense_id, "user_id": user_id, "share_cents": share_cents}
+
+
+def _unrecorded_shares(db: Session, group_id: Optional[int] = None) -> Dict[int, List[dict]]:
+    """
+    Compute ``ExpenseShare`` rows, by group id, for expenses that have none,
+    splitting each equally among the members of its group at the time it
+    was created (by ``GroupMember.joined_at``). Nothing is written.
+    """
+    missing = (
+        select(
+            Expense.group_id,
+            Expense.id,
+            Expense.amount_cents,
+            Expense.created_at,
+            Expense.paid_by_user_id,
+        )
+        .where(~exists().where(ExpenseShare.expense_id == Expense.id))
+        .order_by(Expense.group_id)
+    )
+    members = select(GroupMember.group_id, GroupMember.joined_at, GroupMember.user_id, GroupMember.id)
+    if group_id is not None:
+        missing = missing.where(Expense.group_id == group_id)
+        members = members.where(GroupMember.group_id == group_id)
+
+    expenses = defaultdict(list)
+    for gid, *expense in db.execute(missing):
+        expenses[gid].append(expense)
+    if not expenses:
+        return {}
+    joined = defaultdict(list)
+    for gid, joined_at, user_id, member_id in db.execute(members):
+        joined[gid].append((joined_at or datetime.min, member_id, user_id))
+
+    shares = {}
+    for gid, group_expenses in expenses.items():
+        group_expenses.sort(key=lambda expense: (expense[2] or datetime.max, expense[0]))
+        group_joined = [(joined_at, user_id) for joined_at, _, user_id in sorted(joined[gid])]
+        shares[gid] = list(_present_member_shares(group_expenses, group_joined))
+    return shares
+
+
+def backfill_expense_shares(db: Session, group_id: Optional[int] = None) -> int:
+    """
+    Record shares for expenses that have none, e.g. those created before
+    shares were recorded (see `_unrecorded_shares`). Returns the number of
+    expenses backfilled. The caller is responsible for committing.
+    """
+    db.flush()
+    rows = [row for group_rows in _unrecorded_shares(db, group_id).values() for row in group_rows]
+    if rows:
+        db.execute(insert(ExpenseShare), rows)
+    return len({row["expense_id"] for row in rows})
+
+
+def history_balances(db: Session, group_id: int) -> Dict[int, Tuple[int, int]]:
+    """
+    Compute (paid_cents, share_cents) per member from the group's expense
+    history, including shares not yet recorded, without writing anything.
+    """
+    balances = {
+        user_id: [paid_cents, share_cents]
+        for user_id, (paid_cents, share_cents) in compute_group_balances(db, group_id).items()
+    }
+    for row in _unrecorded_shares(db, group_id).get(group_id, []):
+        if row["user_id"] in balances:
+            balances[row["user_id"]][1] += row["share_cents"]
+    return {user_id: tuple(totals) for user_id, totals in balances.items()}
+
+
+def record_expense(db: Session, expense: Expense, shares: Dict[int, int]) -> None:
+    """Apply a new expense and its shares to the ledger. The caller is responsible for committing."""
+    db.flush()
+    record_expenses(
+        db,
+        expense.group_id,
+        [NewExpense(expense.id, expense.paid_by_user_id, expense.amount_cents, shares)],
+    )
+
+
+def record_expenses(db: Session, group_id: int, expenses: List[NewExpense]) -> None:
+    """
+    Store the shares of new expenses and apply them to the ledger.
+
+    Uses one insert for the shares and one executemany each for the payers'
+    and participants' totals, however many expenses were added. The caller
+    is responsible for committing.
+    """
+    if not expenses:
+        return
+    db.flush()
+    share_rows = [
+        {"expense_id": expense.expense_id, "user_id": user_id, "share_cents": share_cents}
+        for expense in expenses
+        for user_id, share_cents in expense.shares.items()
+    ]
+    if share_rows:
+        db.execute(insert(ExpenseShare), share_rows)
+
+    paid_by_user = defaultdict(int)
+    share_by_user = defaultdict(int)
+    for expense in expenses:
+        paid_by_user[expense.paid_by_user_id] += expense.amount_cents
+        for user_id, share_cents in expense.shares.items():
+            share_by_user[user_id] += share_cents
+
+    balances = GroupBalance.__table__
+    for column, totals in (("paid_cents", paid_by_user), ("share_cents", share_by_user)):
+        if not totals:
+            continue
+        db.execute(
+            update(balances)
+            .where(
+                balances.c.group_id == group_id,
+                balances.c.user_id == bindparam("member_id"),
+            )
+            .values({column: balances.c[column] + bindparam("cents", type_=BigInteger)}),
+            [{"member_id": user_id, "cents": cents} for user_id, cents in totals.items()],
+        )
+
+
+def record_member(db: Session, group_id: int, user_id: int) -> None:
+    """Open a ledger entry for a new member. The caller is responsible for committing."""
+    record_members(db, group_id, [user_id])
+
+
+def record_members(db: Session, group_id: int, user_ids: List[int]) -> None:
+    """
+    Open ledger entries for new members with one bulk insert.
+
+    Shares of existing expenses were fixed when they were created, so no
+    other member's balance changes. The caller is responsible for committing.
+    """
+    if not user_ids:
+        return
+    db.flush()
+    db.execute(
+        insert(GroupBalance),
+        [
+            {"group_id": group_id, "user_id": user_id, "paid_cents": 0, "share_cents": 0}
+            for user_id in user_ids
+        ],
+    )
+
+
+def _write_ledger(
+    db: Session,
+    balances: Dict[Tuple[int, int], Tuple[int, int]],
+    group_id: Optional[int] = None,
+) -> int:
+    """Replace ledger entries (for one group or all groups) with the given balances."""
+    query = db.query(GroupBalance)
+    if group_id is not None:
+        query = query.filter(GroupBalance.group_id == group_id)
+    query.delete(synchronize_session=False)
+    if balances:
+        db.execute(
+            insert(GroupBalance),
+            [
+                {
+                    "group_id": gid,
+                    "user_id": user_id,
+                    "paid_cents": paid_cents,
+                    "share_cents": share_cents,
+                }
+                for (gid, user_id), (paid_cents, share_cents) in balances.items()
+            ],
+        )
+    return len(balances)
+
+
+def rebuild_group_ledger(db: Session, group_id: int) -> int:
+    """Replace a group's ledger entries with values recomputed from expense history."""
+    backfill_expense_shares(db, group_id)
+    return _write_ledger(db, aggregate_balances(db, group_id), group_id)
+
+
+def get_group_ledger(db: Session, group_id: int) -> list:
+    """
+    Get (user_id, paid_cents, share_cents) rows for every member of a group.
+
+    If any member has no ledger entry (e.g. it was added outside the API),
+    the group's balances are computed from expense history instead. Reads
+    never write the ledger; the startup migration and ``python -m app.ledger
+    rebuild`` fill in missing entries.
+    """
+    rows = _ledger_rows(db, group_id)
+    if any(row.paid_cents is None for row in rows):
+        history = history_balances(db, group_id)
+        rows = [LedgerEntry(row.user_id, *history[row.user_id]) for row in rows]
+    return rows
+
+
+def _ledger_rows(db: Session, group_id: int) -> list:
+    return (
+        db.query(GroupMember.user_id, GroupBalance.paid_cents, GroupBalance.share_cents)
+        .outerjoin(
+            GroupBalance,
+            and_(
+                GroupBalance.group_id == GroupMember.group_id,
+                GroupBalance.user_id == GroupMember.user_id,
+            ),
+        )
+        .filter(GroupMember.group_id == group_id)
+        .order_by(GroupMember.id)
+        .all()
+    )
+
+
+def get_user_ledger(db: Session, user_id: int) -> list:
+    """
+    Get (group_id, group_name, paid_cents, share_cents) rows for every group
+    the user is a member of, in one query.
+
+    Groups missing the user's ledger entry are computed from expense
+    history, without writing, as in `get_group_ledger`.
+    """
+    rows = _user_ledger_rows(db, user_id)
+    return [
+        UserLedgerEntry(row.group_id, row.group_name, *history_balances(db, row.group_id)[user_id])
+        if row.paid_cents is None
+        else row
+        for row in rows
+    ]
+
+
+def _user_ledger_rows(db: Session, user_id: int) -> list:
+    return (
+        db.query(
+            GroupMember.group_id,
+            Group.name.label("group_name"),
+            GroupBalance.paid_cents,
+            GroupBalance.share_cents,
+        )
+        .join(Group, Group.id == GroupMember.group_id)
+        .outerjoin(
+            GroupBalance,
+            and_(
+                GroupBalance.group_id == GroupMember.group_id,
+                GroupBalance.user_id == GroupMember.user_id,
+            ),
+        )
+        .filter(GroupMember.user_id == user_id)
+        .order_by(GroupMember.group_id)
+        .all()
+    )
+
+
+def rebuild_ledger(db: Session, group_id: Optional[int] = None, engine: str = "sql") -> int:
+    """Rebuild the ledger for one group or all groups. Returns the number of entries written."""
+    backfill_expense_shares(db, group_id)
+    written = _write_ledger(db, aggregate_balances(db, group_id, engine), group_id)
+    db.commit()
+    return written
+
+
+def verify_ledger(
+    db: Session, group_id: Optional[int] = None, engine: str = "sql"
+) -> List[LedgerDrift]:
+    """Compare the ledger against expense history and report every mismatch."""
+    expected = aggregate_balances(db, group_id, engine)
+    query = db.query(GroupBalance)
+    if group_id is not None:
+        query = query.filter(GroupBalance.group_id == group_id)
+    recorded = {
+        (entry.group_id, entry.user_id): (entry.paid_cents, entry.share_cents)
+        for entry in query
+    }
+
+    drift = []
+    for gid, user_id in sorted(set(expected) | set(recorded)):
+        expected_values = expected.get((gid, user_id), (None, None))
+        recorded_values = recorded.get((gid, user_id), (None, None))
+        for field, rec, exp in zip(
+            ("paid_cents", "share_cents"), recorded_values, expected_values
+        ):
+            if rec is None or exp is None or rec != exp:
+                drift.append(LedgerDrift(gid, user_id, field, rec, exp))
+    return drift
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for rebuilding or verifying the ledger."""
+    from app.database import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(description="Rebuild or verify the group balance ledger.")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--group-id", type=int, default=None, help="Limit to a single group")
+    parser.add_argument(
+        "--engine",
+        choices=["sql", "numpy"],
+        default="sql",
+        help="Aggregate in the database (sql) or in memory with NumPy (numpy)",
+    )
+    args = parser.parse_args(argv)
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            written = rebuild_ledger(db, args.group_id, args.engine)
+            print(f"✓ Rebuilt {written} ledger entries")
+            return 0
+
+        drift = verify_ledger(db, args.group_id, args.engine)
+        for item in drift:
+            print(
+                f"  group={item.group_id} user={item.user_id} {item.field}: "
+                f"recorded={item.recorded} expected={item.expected}"
+            )
+        if drift:
+            print(f"✗ Ledger drift detected in {len(drift)} value(s)")
+            return 1
+        print("✓ Ledger matches expense history")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
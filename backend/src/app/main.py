@@ -1,9 +1,18 @@
 """Main FastAPI application."""
-from fastapi import FastAPI
+import math
+
+from fastapi import FastAPI, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from app.auth import password_hash_pool, principal_cache
+from app.balance_cache import balance_cache
+from app.compression import CompressionMiddleware
 from app.config import settings
-from app.database import init_db
+from app.database import engine, init_db
+from app.db_pool import pool_stats
 from app.routers import auth, users, groups, expenses
 
 # Initialize database
@@ -23,14 +32,49 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # Pagination cursor and group versions
 )
 
+# Response compression (gzip, plus brotli/zstd when installed)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=[encoding.strip() for encoding in settings.compression_encodings.split(",")],
+        minimum_size=settings.compression_minimum_size,
+        levels={
+            "gzip": settings.compression_gzip_level,
+            "br": settings.compression_brotli_quality,
+            "zstd": settings.compression_zstd_level,
+        },
+    )
+
 # Include routers
 app.include_router(auth.router, prefix=settings.api_v1_prefix)
 app.include_router(users.router, prefix=settings.api_v1_prefix)
 app.include_router(groups.router, prefix=settings.api_v1_prefix)
 app.include_router(expenses.router, prefix=settings.api_v1_prefix)
 
+# Async database mode serves the core routes side by side with the sync API
+if settings.async_database_enabled:
+    from app.routers import async_expenses, async_groups, async_users
+
+    app.include_router(async_users.router, prefix=settings.async_api_prefix)
+    app.include_router(async_groups.router, prefix=settings.async_api_prefix)
+    app.include_router(async_expenses.router, prefix=settings.async_api_prefix)
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """FastAPI's 422 response, echoing non-finite inputs such as Infinity as strings."""
+    detail = jsonable_encoder(
+        exc.errors(),
+        custom_encoder={float: lambda value: value if math.isfinite(value) else str(value)},
+    )
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+        content={"detail": detail},
+    )
+
 
 @app.get("/")
 def root():
@@ -47,3 +91,19 @@ def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+
+
+@app.get("/metrics")
+def metrics():
+    """Runtime metrics for caches and worker pools."""
+    runtime_metrics = {
+        "principal_cache": principal_cache.stats(),
+        "balance_cache": balance_cache.stats(),
+        "database_pool": pool_stats(engine.pool),
+        "password_hash_pool": password_hash_pool.stats(),
+    }
+    if settings.async_database_enabled:
+        from app.database_async import get_async_engine
+
+        runtime_metrics["async_database_pool"] = pool_stats(get_async_engine().sync_engine.pool)
+    return runtime_metrics
@@ -0,0 +1,167 @@
+"""Idempotent schema migrations for databases created by earlier versions.
+
+``Base.metadata.create_all`` only creates missing tables, so indexes and
+constraints added to existing tables are applied here. Every step checks the
+current schema first and is safe to run on every startup, on SQLite and
+PostgreSQL alike. Run ``python -m app.migrations`` to apply them manually.
+"""
+import sys
+
+from sqlalchemy import and_, func, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.ledger import backfill_expense_shares, rebuild_group_ledger, rebuild_ledger
+from app.models import Expense, Group, GroupBalance, GroupMember
+
+
+def _index_names(engine: Engine, table_name: str) -> set:
+    return {index["name"] for index in inspect(engine).get_indexes(table_name)}
+
+
+def _column_names(engine: Engine, table_name: str) -> set:
+    return {column["name"] for column in inspect(engine).get_columns(table_name)}
+
+
+def convert_money_to_cents(engine: Engine) -> list:
+    """Move float amounts to integer cents and rebuild the ledger in cents."""
+    changed = []
+    if "amount_cents" not in _column_names(engine, Expense.__tablename__):
+        with engine.begin() as conn:
+            conn.execute(text(
+                "ALTER TABLE expenses ADD COLUMN amount_cents BIGINT NOT NULL DEFAULT 0"
+            ))
+            conn.execute(text(
+                "UPDATE expenses SET amount_cents = CAST(ROUND(amount * 100) AS BIGINT)"
+            ))
+            conn.execute(text("ALTER TABLE expenses DROP COLUMN amount"))
+        changed.append("expenses.amount_cents")
+
+    if "paid_cents" not in _column_names(engine, GroupBalance.__tablename__):
+        # The ledger is derived from expense history, so recreate and rebuild it
+        GroupBalance.__table__.drop(bind=engine)
+        GroupBalance.__table__.create(bind=engine)
+        with Session(engine) as db:
+            rebuild_ledger(db)
+        changed.append("group_balances.paid_cents")
+    return changed
+
+
+def remove_duplicate_memberships(engine: Engine) -> list:
+    """
+    Delete duplicate (group_id, user_id) memberships, keeping the oldest row.
+
+    Runs before any step that records shares from memberships, since a
+    duplicate member would get two shares of the same expense.
+    """
+    ledger_in_cents = (
+        "amount_cents" in _column_names(engine, Expense.__tablename__)
+        and "paid_cents" in _column_names(engine, GroupBalance.__tablename__)
+    )
+    with Session(engine) as db:
+        keep_ids = (
+            select(func.min(GroupMember.id))
+            .group_by(GroupMember.group_id, GroupMember.user_id)
+            .scalar_subquery()
+        )
+        duplicate_groups = [
+            group_id
+            for (group_id,) in db.query(GroupMember.group_id)
+            .filter(GroupMember.id.not_in(keep_ids))
+            .distinct()
+        ]
+        if not duplicate_groups:
+            return []
+
+        db.query(GroupMember).filter(GroupMember.id.not_in(keep_ids)).delete(
+            synchronize_session=False
+        )
+        # Duplicates inflated the member count used to split expenses. A
+        # ledger still in floats is rebuilt by `convert_money_to_cents`.
+        if ledger_in_cents:
+            for group_id in duplicate_groups:
+                rebuild_group_ledger(db, group_id)
+        db.commit()
+    return ["group_members duplicates"]
+
+
+def record_legacy_expense_shares(engine: Engine) -> list:
+    """Record shares for expenses created before shares were stored, then rebuild the ledger."""
+    with Session(engine) as db:
+        if not backfill_expense_shares(db):
+            return []
+        rebuild_ledger(db)
+    return ["expense_shares"]
+
+
+def fill_missing_ledger_entries(engine: Engine) -> list:
+    """Rebuild the ledger of groups with members that have no ledger entry."""
+    with Session(engine) as db:
+        stale_groups = [
+            group_id
+            for (group_id,) in db.query(GroupMember.group_id)
+            .outerjoin(
+                GroupBalance,
+                and_(
+                    GroupBalance.group_id == GroupMember.group_id,
+                    GroupBalance.user_id == GroupMember.user_id,
+                ),
+            )
+            .filter(GroupBalance.id.is_(None))
+            .distinct()
+        ]
+        if not stale_groups:
+            return []
+        for group_id in stale_groups:
+            rebuild_group_ledger(db, group_id)
+        db.commit()
+    return ["group_balances entries"]
+
+
+def add_group_versions(engine: Engine) -> list:
+    """Add the group version counter used for ETags."""
+    if "version" in _column_names(engine, Group.__tablename__):
+        return []
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE groups ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+    return ["groups.version"]
+
+
+def add_hot_path_indexes(engine: Engine) -> list:
+    """Create the membership and expense history indexes if they are missing."""
+    created = []
+    for table in (GroupMember.__table__, Expense.__table__):
+        existing = _index_names(engine, table.name)
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            index.create(bind=engine)
+            created.append(index.name)
+    return created
+
+
+def apply_migrations(engine: Engine) -> list:
+    """Apply all pending migrations and return the names of the changes made."""
+    return (
+        remove_duplicate_memberships(engine)
+        + add_group_versions(engine)
+        + convert_money_to_cents(engine)
+        + record_legacy_expense_shares(engine)
+        + fill_missing_ledger_entries(engine)
+        + add_hot_path_indexes(engine)
+    )
+
+
+def main() -> int:
+    """Command line entry point for applying migrations."""
+    from app.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    for change in apply_migrations(engine):
+        print(f"  Applied {change}")
+    print("✓ Database schema is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
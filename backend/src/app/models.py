@@ -1,8 +1,10 @@
 """Database models."""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean
+from sqlalchemy import BigInteger, Column, Integer, String, ForeignKey, DateTime, Boolean, Index, UniqueConstraint
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.money import CENTS_PER_UNIT, from_cents, to_cents
 
 
 class User(Base):
@@ -31,10 +33,12 @@ class Group(Base):
     description = Column(String, nullable=True)
     created_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped on every change, used for ETags
     
     # Relationships
     members = relationship("GroupMember", back_populates="group", cascade="all, delete-orphan")
     expenses = relationship("Expense", back_populates="group", cascade="all, delete-orphan")
+    balances = relationship("GroupBalance", back_populates="group", cascade="all, delete-orphan")
     creator = relationship("User", foreign_keys=[created_by_user_id])
 
 
@@ -51,7 +55,13 @@ class GroupMember(Base):
     group = relationship("Group", back_populates="members")
     user = relationship("User", back_populates="groups")
     
-    __table_args__ = ({"sqlite_autoincrement": True},)
+    __table_args__ = (
+        # Membership checks filter on (group_id, user_id); a user joins a group once
+        Index("ix_group_members_group_user", "group_id", "user_id", unique=True),
+        # Listing a user's groups filters on user_id
+        Index("ix_group_members_user_group", "user_id", "group_id"),
+        {"sqlite_autoincrement": True},
+    )
 
 
 class Expense(Base):
@@ -61,7 +71,7 @@ class Expense(Base):
     id = Column(Integer, primary_key=True, index=True)
     group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
     paid_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount_cents = Column(BigInteger, nullable=False)  # Stored in whole cents
     description = Column(String, nullable=True)
     expense_metadata = Column(String, nullable=True)  # JSON string for additional metadata
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -69,4 +79,62 @@ class Expense(Base):
     # Relationships
     group = relationship("Group", back_populates="expenses")
     paid_by_user = relationship("User", back_populates="expenses_paid", foreign_keys=[paid_by_user_id])
+    shares = relationship("ExpenseShare", back_populates="expense", cascade="all, delete-orphan")
+    
+    @hybrid_property
+    def amount(self):
+        """Amount in currency units, backed by `amount_cents`."""
+        if self.amount_cents is None:
+            return None
+        return from_cents(self.amount_cents)
+    
+    @amount.setter
+    def amount(self, value):
+        self.amount_cents = to_cents(value)
+    
+    @amount.expression
+    def amount(cls):
+        return cls.amount_cents / float(CENTS_PER_UNIT)
+    
+    __table_args__ = (
+        # Expense history is filtered by group and ordered by (created_at, id)
+        Index("ix_expenses_group_created", "group_id", "created_at", "id"),
+    )
+
+
+class ExpenseShare(Base):
+    """A participant's share of an expense, fixed when the expense is created."""
+    __tablename__ = "expense_shares"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    expense_id = Column(Integer, ForeignKey("expenses.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    share_cents = Column(BigInteger, nullable=False)  # Stored in whole cents
+    
+    # Relationships
+    expense = relationship("Expense", back_populates="shares")
+    user = relationship("User")
+    
+    __table_args__ = (
+        UniqueConstraint("expense_id", "user_id", name="uq_expense_shares_expense_user"),
+    )
+
 
+class GroupBalance(Base):
+    """Per-member balance ledger entry, kept in step with expenses and memberships."""
+    __tablename__ = "group_balances"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    paid_cents = Column(BigInteger, nullable=False, default=0)  # Sum of expenses paid by the user
+    share_cents = Column(BigInteger, nullable=False, default=0)  # Sum of the user's shares of expenses
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    group = relationship("Group", back_populates="balances")
+    user = relationship("User")
+    
+    __table_args__ = (
+        UniqueConstraint("group_id", "user_id", name="uq_group_balances_group_user"),
+    )
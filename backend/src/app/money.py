@@ -0,0 +1,67 @@
+"""Money arithmetic in integer cents.
+
+Amounts are stored and aggregated as whole cents so totals are exact and
+balances always sum to zero. Floats only appear at the API boundary.
+"""
+import math
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from fractions import Fraction
+from typing import List, Sequence
+
+CENTS_PER_UNIT = 100
+
+# Largest accepted amount; its cents, and totals of many such amounts, fit in a BIGINT
+MAX_AMOUNT = 1e12
+
+
+def to_cents(amount: float) -> int:
+    """
+    Convert an amount to whole cents, rounding half a cent away from zero.
+
+    Raises ValueError for amounts with no whole number of cents, such as
+    infinity or NaN.
+    """
+    try:
+        cents = Decimal(str(amount)) * CENTS_PER_UNIT
+        return int(cents.to_integral_value(rounding=ROUND_HALF_UP))
+    except (InvalidOperation, OverflowError, ValueError):
+        raise ValueError(f"Not a valid amount: {amount!r}") from None
+
+
+def from_cents(cents: int) -> float:
+    """Convert whole cents to an amount."""
+    return cents / CENTS_PER_UNIT
+
+
+def split_cents(total_cents: int, parts: int) -> List[int]:
+    """
+    Split an amount into `parts` shares that differ by at most one cent.
+
+    The remainder cents go to the first shares, so the split is deterministic
+    for a given ordering and the shares always sum to `total_cents`.
+    """
+    if parts <= 0:
+        return []
+    base, remainder = divmod(total_cents, parts)
+    return [base + 1] * remainder + [base] * (parts - remainder)
+
+
+def split_weighted(total_cents: int, weights: Sequence[float]) -> List[int]:
+    """
+    Split an amount in proportion to `weights` (largest remainder method).
+
+    Every share gets the whole cents of its exact quota; the cents left over
+    go to the largest fractional parts, earliest first on ties. The shares
+    always sum to `total_cents`.
+    """
+    exact_weights = [Fraction(str(weight)) for weight in weights]
+    weight_total = sum(exact_weights)
+    if not exact_weights or weight_total <= 0:
+        return [0] * len(exact_weights)
+    quotas = [total_cents * weight / weight_total for weight in exact_weights]
+    shares = [math.floor(quota) for quota in quotas]
+    leftover = total_cents - sum(shares)
+    by_remainder = sorted(range(len(quotas)), key=lambda i: (shares[i] - quotas[i], i))
+    for i in by_remainder[:leftover]:
+        shares[i] += 1
+    return shares
@@ -0,0 +1,31 @@
+"""Keyset pagination cursors for time-ordered listings."""
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+# Largest page a client may request
+MAX_PAGE_SIZE = 500
+
+# Largest row id a cursor may carry, so it always binds as a BIGINT
+MAX_ROW_ID = 2**63 - 1
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode the position of the last row of a page as an opaque cursor."""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by `encode_cursor`. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(created_at)
+    except (TypeError, ValueError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    # bool is an int subclass, and floats or huge ints cannot be row ids
+    if type(row_id) is not int or not 1 <= row_id <= MAX_ROW_ID:
+        raise ValueError("Invalid cursor")
+    return created_at, row_id
@@ -0,0 +1,71 @@
+"""Bounded worker pool for CPU-heavy password hashing.
+
+bcrypt deliberately takes hundreds of milliseconds per call. Running it on
+the request threadpool lets a burst of logins occupy every worker and stall
+unrelated endpoints. This pool caps how many hashes run at once and how many
+may wait, and rejects work beyond that immediately so callers can shed load.
+bcrypt releases the GIL while hashing, so threads give real parallelism.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class PasswordHashPoolSaturated(Exception):
+    """Raised when the pool already has its maximum amount of queued work."""
+
+
+class PasswordHashPool:
+    """Runs password hashing on a fixed number of threads with a bounded queue."""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any):
+        """Queue a call and return its future. Raises PasswordHashPoolSaturated when full."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHashPoolSaturated()
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release(completed=True))
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a call on the pool and await its result without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _release(self, completed: bool = False) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if completed:
+                self.completed += 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        """Get queue depth and throughput counters."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,168 @@
+"""Expense management routes for the async database mode."""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional, Union
+
+from app.balance_cache import (
+    cache_balance_summary,
+    get_cached_balance_summary,
+    invalidate_group_balances,
+)
+from app.database_async import get_async_db, write_transaction_async
+from app.dependencies_async import (
+    get_current_active_user_async,
+    get_member_group_async,
+    resolve_group_membership_async,
+)
+from app.etags import bump_group_version, group_etag, not_modified
+from app.ledger import record_expense
+from app.models import Expense, Group, User
+from app.money import to_cents
+from app.pagination import MAX_PAGE_SIZE
+from app.routers.expenses import (
+    STREAM_BATCH_SIZE,
+    expense_history_statement,
+    expense_history,
+    expense_response,
+    group_balances,
+    ndjson_lines,
+    paginated_rows,
+)
+from app.schemas import (
+    CompactExpenseHistory,
+    ExpenseCreate,
+    ExpenseResponse,
+    GroupBalanceSummary,
+)
+from app.serialization import FastJSONResponse
+from app.splits import expense_shares, group_member_ids
+
+router = APIRouter(prefix="/expenses", tags=["expenses (async)"])
+
+
+@router.post(
+    "",
+    response_model=ExpenseResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(write_transaction_async)],
+)
+async def create_expense(
+    expense: ExpenseCreate,
+    request: Request,
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Add an expense for a group."""
+    # Check the group exists and the current user is a member
+    await resolve_group_membership_async(request, db, expense.group_id, current_user)
+    
+    # Check if paying user is a member of the group
+    member_ids = await db.run_sync(group_member_ids, expense.group_id)
+    if expense.paid_by_user_id not in member_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Paying user must be a member of the group"
+        )
+    
+    # Work out each participant's share
+    try:
+        shares = expense_shares(to_cents(expense.amount), expense.split, member_ids)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    
+    # Create expense
+    db_expense = Expense(
+        group_id=expense.group_id,
+        paid_by_user_id=expense.paid_by_user_id,
+        amount=expense.amount,
+        description=expense.description,
+        expense_metadata=expense.expense_metadata,
+    )
+    db.add(db_expense)
+    await db.run_sync(record_expense, db_expense, shares)
+    await db.run_sync(bump_group_version, expense.group_id)
+    await db.commit()
+    invalidate_group_balances(expense.group_id)
+    await db.refresh(db_expense, ["paid_by_user"])
+    
+    return expense_response(db_expense)
+
+
+@router.get("/group/{group_id}", response_model=Union[List[ExpenseResponse], CompactExpenseHistory])
+async def get_group_expenses(
+    group_id: int,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    compact: bool = False,
+    group: Group = Depends(get_member_group_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """View expense history for a group, newest first (see the sync route for parameters)."""
+    etag = group_etag(group, "expenses", request)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers["ETag"] = etag
+    
+    statement = expense_history_statement(group_id, cursor)
+    
+    if output_format == "ndjson":
+        if compact:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Compact responses are only available in JSON format"
+            )
+        if limit is not None:
+            statement = statement.limit(limit)
+        return StreamingResponse(
+            _stream_expenses(db, statement),
+            media_type="application/x-ndjson",
+            headers={"ETag": etag},
+        )
+    
+    if limit is None:
+        rows = await db.execute(statement)
+    else:
+        # Fetch one extra row to find out whether another page exists
+        rows = paginated_rows((await db.execute(statement.limit(limit + 1))).all(), limit, response)
+    return FastJSONResponse(expense_history(rows, compact), headers=response.headers)
+
+
+async def _stream_expenses(db: AsyncSession, statement) -> AsyncIterator[bytes]:
+    """Yield expenses as NDJSON from a server-side cursor, one chunk per batch of rows."""
+    result = await db.stream(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+    async for rows in result.partitions():
+        yield ndjson_lines(rows)
+
+
+@router.get("/group/{group_id}/balance", response_model=GroupBalanceSummary)
+async def get_group_balance_summary(
+    group_id: int,
+    request: Request,
+    response: Response,
+    group: Group = Depends(get_member_group_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Summarize balance by amount owed to members, from the shares stored for each expense."""
+    etag = group_etag(group, "balance")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers["ETag"] = etag
+    
+    summary = get_cached_balance_summary(group)
+    if summary is None:
+        summary = GroupBalanceSummary(
+            group_id=group_id,
+            group=group,
+            balances=await db.run_sync(group_balances, group_id),
+        )
+        cache_balance_summary(group, summary)
+    return summary
@@ -0,0 +1,128 @@
+"""Group management routes for the async database mode."""
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.balance_cache import invalidate_group_balances
+from app.database_async import get_async_db, write_transaction_async
+from app.dependencies_async import get_current_active_user_async, get_member_group_async
+from app.etags import bump_group_version, group_etag, not_modified
+from app.ledger import record_member
+from app.models import Group, GroupMember, User
+from app.routers.groups import WITH_MEMBERS
+from app.schemas import (
+    GroupCreate,
+    GroupResponse,
+    GroupWithMembers,
+    GroupMemberResponse,
+    AddMemberRequest,
+)
+
+router = APIRouter(prefix="/groups", tags=["groups (async)"])
+
+
+@router.post(
+    "",
+    response_model=GroupResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(write_transaction_async)],
+)
+async def create_group(
+    group: GroupCreate,
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create a new group."""
+    db_group = Group(
+        name=group.name,
+        description=group.description,
+        created_by_user_id=current_user.id,
+    )
+    db.add(db_group)
+    await db.flush()
+    
+    # Add creator as a member
+    db.add(GroupMember(group_id=db_group.id, user_id=current_user.id))
+    await db.run_sync(record_member, db_group.id, current_user.id)
+    await db.commit()
+    
+    return db_group
+
+
+@router.get("", response_model=List[GroupWithMembers])
+async def get_my_groups(
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get all groups the current user is a member of."""
+    groups = await db.scalars(
+        select(Group)
+        .join(GroupMember)
+        .where(GroupMember.user_id == current_user.id)
+        .options(WITH_MEMBERS)
+    )
+    return groups.all()
+
+
+@router.get("/{group_id}", response_model=GroupWithMembers)
+async def get_group(
+    group_id: int,
+    request: Request,
+    response: Response,
+    group: Group = Depends(get_member_group_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a specific group by ID. Honours `If-None-Match` with the group's ETag."""
+    etag = group_etag(group, "group")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers["ETag"] = etag
+    
+    return await db.scalar(select(Group).where(Group.id == group.id).options(WITH_MEMBERS))
+
+
+@router.post(
+    "/{group_id}/members",
+    response_model=GroupMemberResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(write_transaction_async)],
+)
+async def add_member_to_group(
+    group_id: int,
+    request: AddMemberRequest,
+    group: Group = Depends(get_member_group_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Add a user to a group as a member."""
+    # Check if user exists by email
+    user = await db.scalar(select(User).where(User.email == request.email))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    # Check if user is already a member
+    existing_member = await db.scalar(
+        select(GroupMember.id).where(
+            GroupMember.group_id == group_id,
+            GroupMember.user_id == user.id
+        )
+    )
+    if existing_member:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User is already a member of this group"
+        )
+    
+    # Add member
+    member = GroupMember(group_id=group_id, user_id=user.id)
+    db.add(member)
+    await db.run_sync(record_member, group_id, user.id)
+    await db.run_sync(bump_group_version, group_id)
+    await db.commit()
+    invalidate_group_balances(group_id)
+    await db.refresh(member, ["user"])
+    return member
@@ -0,0 +1,82 @@
+"""User management routes for the async database mode."""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database_async import get_async_db, write_transaction_async
+from app.dependencies_async import get_current_active_user_async
+from app.etags import bump_user_group_versions
+from app.ledger import get_user_ledger
+from app.models import User
+from app.routers.users import user_balance_summary
+from app.schemas import UserBalanceSummary, UserResponse, UserBase
+
+router = APIRouter(prefix="/users", tags=["users (async)"])
+
+
+@router.get("/me", response_model=UserResponse)
+async def get_my_profile(current_user: User = Depends(get_current_active_user_async)):
+    """Get current user's profile."""
+    return current_user
+
+
+@router.put("/me", response_model=UserResponse, dependencies=[Depends(write_transaction_async)])
+async def update_my_profile(
+    user_update: UserBase,
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update current user's profile."""
+    # Check if username or email is being changed and if it's already taken
+    if user_update.username != current_user.username:
+        existing_user = await db.scalar(select(User.id).where(User.username == user_update.username))
+        if existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already taken"
+            )
+    
+    if user_update.email != current_user.email:
+        existing_user = await db.scalar(select(User.id).where(User.email == user_update.email))
+        if existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already taken"
+            )
+    
+    # Update user
+    current_user.username = user_update.username
+    current_user.email = user_update.email
+    current_user.full_name = user_update.full_name
+    
+    # Member details appear in group reads, so their ETags must change
+    await db.run_sync(bump_user_group_versions, current_user.id)
+    await db.commit()
+    await db.refresh(current_user)
+    return current_user
+
+
+@router.get("/me/balances", response_model=UserBalanceSummary)
+async def get_my_balances(
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Summarize the current user's balance in every group and overall."""
+    rows = await db.run_sync(get_user_ledger, current_user.id)
+    return user_balance_summary(current_user.id, rows)
+
+
+@router.get("/{user_id}", response_model=UserResponse)
+async def get_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async),
+):
+    """Get user by ID."""
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
@@ -1,14 +1,16 @@
 """Authentication routes."""
 from datetime import timedelta
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, write_transaction
 from app.models import User
 from app.schemas import UserCreate, UserResponse, UserLogin, Token
 from app.auth import (
-    get_password_hash,
-    authenticate_user,
+    get_password_hash_async,
+    authenticate_user_async,
     create_access_token,
     get_current_active_user,
 )
@@ -18,34 +20,55 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def signup(user: UserCreate, db: Session = Depends(get_db)):
+async def signup(user: UserCreate, db: Session = Depends(get_db)):
     """User sign up."""
+    # Database work runs on the threadpool; hashing runs on the password hash pool
+    def find_existing_user():
+        return db.query(User).filter(
+            (User.username == user.username) | (User.email == user.email)
+        ).first()
+    
+    def is_available() -> bool:
+        available = find_existing_user() is None
+        # End the read transaction, so the insert can start a write transaction
+        db.rollback()
+        return available
+    
+    def save_user(db_user: User) -> Optional[User]:
+        # Take the SQLite write lock only after hashing, and check again under it
+        write_transaction(db)
+        if find_existing_user():
+            return None
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+        return db_user
+    
+    already_registered = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Username or email already registered"
+    )
+    
     # Check if user already exists
-    db_user = db.query(User).filter(
-        (User.username == user.username) | (User.email == user.email)
-    ).first()
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username or email already registered"
-        )
+    if not await run_in_threadpool(is_available):
+        raise already_registered
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
         hashed_password=hashed_password,
         full_name=user.full_name,
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    saved_user = await run_in_threadpool(save_user, db_user)
+    if saved_user is None:
+        raise already_registered
+    return saved_user
 
 
 @router.post("/login", response_model=Token, summary="Login for access token")
-def login(
+async def login(
     user_credentials: UserLogin,
     db: Session = Depends(get_db)
 ):
@@ -58,7 +81,7 @@ def login(
     Returns an access token that you can use in the Authorization header:
     `Authorization: Bearer <token>`
     """
-    user = authenticate_user(db, user_credentials.email, user_credentials.password)
+    user = await authenticate_user_async(db, user_credentials.email, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,66 +1,93 @@
 """Expense management routes."""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, insert, or_, select
 from sqlalchemy.orm import Session
-from typing import List
-from collections import defaultdict
+from typing import Iterable, Iterator, List, Optional, Union
+from datetime import datetime
 
-from app.database import get_db
+from app.balance_cache import (
+    cache_balance_summary,
+    get_cached_balance_summary,
+    invalidate_group_balances,
+)
+from app.database import get_db, write_transaction
+from app.dependencies import get_member_group, resolve_group_membership
+from app.etags import bump_group_version, group_etag, not_modified
+from app.ledger import NewExpense, get_group_ledger, record_expense, record_expenses
+from app.money import from_cents, to_cents
+from app.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from app.serialization import FastJSONResponse, dumps
 from app.models import Expense, Group, GroupMember, User
 from app.schemas import (
+    CompactExpenseHistory,
     ExpenseCreate,
     ExpenseResponse,
+    ExpenseBatchCreate,
+    ExpenseBatchItemResult,
+    ExpenseBatchResponse,
     BalanceSummary,
     GroupBalanceSummary,
+    SettlementPlan,
+    SettlementTransfer,
     UserResponse,
 )
+from app.settlement import EXACT_MAX_PARTICIPANTS, exact_settlements, greedy_settlements
+from app.splits import expense_shares, group_member_ids
 from app.auth import get_current_active_user
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
 
+# Rows fetched per round trip when streaming expense history
+STREAM_BATCH_SIZE = 500
+
+
+def expense_response(expense: Expense) -> ExpenseResponse:
+    """Build an expense response from an ORM expense."""
+    # Manually construct response to avoid SQLAlchemy metadata conflict
+    return ExpenseResponse(
+        id=expense.id,
+        group_id=expense.group_id,
+        paid_by_user_id=expense.paid_by_user_id,
+        amount=expense.amount,
+        description=expense.description,
+        metadata=expense.expense_metadata,  # Map expense_metadata to metadata
+        created_at=expense.created_at,
+        paid_by_user=expense.paid_by_user,
+    )
+
 
-@router.post("", response_model=ExpenseResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=ExpenseResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(write_transaction)],
+)
 def create_expense(
     expense: ExpenseCreate,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """Add an expense for a group."""
-    # Check if group exists
-    group = db.query(Group).filter(Group.id == expense.group_id).first()
-    if not group:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found"
-        )
+    # Check the group exists and the current user is a member
+    resolve_group_membership(request, db, expense.group_id, current_user)
     
-    # Check if current user is a member of the group
-    member = (
-        db.query(GroupMember)
-        .filter(
-            GroupMember.group_id == expense.group_id,
-            GroupMember.user_id == current_user.id
-        )
-        .first()
-    )
-    if not member:
+    # Check if paying user is a member of the group
+    member_ids = group_member_ids(db, expense.group_id)
+    if expense.paid_by_user_id not in member_ids:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You must be a member of the group to add expenses"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Paying user must be a member of the group"
         )
     
-    # Check if paying user is a member of the group
-    paying_member = (
-        db.query(GroupMember)
-        .filter(
-            GroupMember.group_id == expense.group_id,
-            GroupMember.user_id == expense.paid_by_user_id
-        )
-        .first()
-    )
-    if not paying_member:
+    # Work out each participant's share
+    try:
+        shares = expense_shares(to_cents(expense.amount), expense.split, member_ids)
+    except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Paying user must be a member of the group"
+            detail=str(exc)
         )
     
     # Create expense
@@ -72,152 +99,387 @@ def create_expense(
         expense_metadata=expense.expense_metadata,
     )
     db.add(db_expense)
+    record_expense(db, db_expense, shares)
+    bump_group_version(db, expense.group_id)
     db.commit()
+    invalidate_group_balances(expense.group_id)
     db.refresh(db_expense)
     
-    # Manually construct response to avoid SQLAlchemy metadata conflict
-    return ExpenseResponse(
-        id=db_expense.id,
-        group_id=db_expense.group_id,
-        paid_by_user_id=db_expense.paid_by_user_id,
-        amount=db_expense.amount,
-        description=db_expense.description,
-        metadata=db_expense.expense_metadata,  # Map expense_metadata to metadata
-        created_at=db_expense.created_at,
-        paid_by_user=db_expense.paid_by_user,
-    )
+    return expense_response(db_expense)
 
 
-@router.get("/group/{group_id}", response_model=List[ExpenseResponse])
-def get_group_expenses(
-    group_id: int,
+@router.post(
+    "/batch",
+    response_model=ExpenseBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(write_transaction)],
+)
+def create_expenses_batch(
+    batch: ExpenseBatchCreate,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    """View expense history for a group."""
-    # Check if group exists
-    group = db.query(Group).filter(Group.id == group_id).first()
-    if not group:
+    """
+    Add many expenses to a group in a single transaction.
+    
+    - **all_or_nothing** (default): if any expense is invalid, nothing is created
+      and the request fails with 400, listing the per-expense results.
+    - **best_effort**: valid expenses are created and invalid ones are reported.
+      If none is valid, the request fails with 400 in the same way.
+    """
+    # Check the group exists and the current user is a member
+    resolve_group_membership(request, db, batch.group_id, current_user)
+    
+    # Load the group's members once for every payer check and split
+    member_ids = group_member_ids(db, batch.group_id)
+    member_id_set = set(member_ids)
+    
+    results = []
+    valid_items = []
+    for index, item in enumerate(batch.expenses):
+        error = None
+        if item.paid_by_user_id not in member_id_set:
+            error = "Paying user must be a member of the group"
+        else:
+            try:
+                shares = expense_shares(to_cents(item.amount), item.split, member_ids)
+            except ValueError as exc:
+                error = str(exc)
+        if error is None:
+            valid_items.append((index, item, shares))
+            results.append(ExpenseBatchItemResult(index=index, status="created"))
+        else:
+            results.append(ExpenseBatchItemResult(index=index, status="failed", error=error))
+    failed = len(batch.expenses) - len(valid_items)
+    
+    if failed and (batch.mode == "all_or_nothing" or not valid_items):
+        for result in results:
+            if result.status == "created":
+                result.status = "skipped"
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ExpenseBatchResponse(
+                group_id=batch.group_id,
+                mode=batch.mode,
+                created=0,
+                failed=failed,
+                results=results,
+            ).model_dump(),
         )
     
-    # Check if current user is a member
-    member = (
-        db.query(GroupMember)
-        .filter(
-            GroupMember.group_id == group_id,
-            GroupMember.user_id == current_user.id
-        )
-        .first()
+    if valid_items:
+        created_at = datetime.utcnow()
+        expense_ids = db.scalars(
+            insert(Expense).returning(Expense.id, sort_by_parameter_order=True),
+            [
+                {
+                    "group_id": batch.group_id,
+                    "paid_by_user_id": item.paid_by_user_id,
+                    "amount_cents": to_cents(item.amount),
+                    "description": item.description,
+                    "expense_metadata": item.expense_metadata,
+                    "created_at": created_at,
+                }
+                for _, item, _ in valid_items
+            ],
+        ).all()
+        new_expenses = []
+        for (index, item, shares), expense_id in zip(valid_items, expense_ids):
+            results[index].expense_id = expense_id
+            new_expenses.append(
+                NewExpense(expense_id, item.paid_by_user_id, to_cents(item.amount), shares)
+            )
+        record_expenses(db, batch.group_id, new_expenses)
+        bump_group_version(db, batch.group_id)
+        db.commit()
+        invalidate_group_balances(batch.group_id)
+    
+    return ExpenseBatchResponse(
+        group_id=batch.group_id,
+        mode=batch.mode,
+        created=len(valid_items),
+        failed=failed,
+        results=results,
     )
-    if not member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You must be a member of the group to view expenses"
+
+
+@router.get("/group/{group_id}", response_model=Union[List[ExpenseResponse], CompactExpenseHistory])
+def get_group_expenses(
+    group_id: int,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    compact: bool = False,
+    group: Group = Depends(get_member_group),
+    db: Session = Depends(get_db),
+):
+    """
+    View expense history for a group, newest first.
+    
+    - **limit**: Return at most this many expenses. When more are available, the
+      `X-Next-Cursor` response header holds the cursor for the next page.
+    - **cursor**: Continue after the page that returned this cursor.
+    - **format**: `ndjson` streams the history (from `cursor` onwards) as
+      newline-delimited JSON without loading it all into memory. `limit`
+      caps the number of expenses streamed, but no `X-Next-Cursor` is sent.
+    - **compact**: Return `{"expenses": [...], "users": {...}}`, where expenses
+      reference their payer by `paid_by_user_id` and each payer appears once
+      in `users`. Only available with the JSON format.
+    
+    Responses carry an ETag; send it back in `If-None-Match` to get a 304
+    while the group is unchanged.
+    """
+    etag = group_etag(group, "expenses", request)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers["ETag"] = etag
+    
+    statement = expense_history_statement(group_id, cursor)
+    
+    if output_format == "ndjson":
+        if compact:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Compact responses are only available in JSON format"
+            )
+        if limit is not None:
+            statement = statement.limit(limit)
+        return StreamingResponse(
+            _stream_expenses(db, statement),
+            media_type="application/x-ndjson",
+            headers={"ETag": etag},
         )
     
-    # Get all expenses for the group
-    expenses = (
-        db.query(Expense)
-        .filter(Expense.group_id == group_id)
-        .order_by(Expense.created_at.desc())
-        .all()
+    if limit is None:
+        rows = db.execute(statement)
+    else:
+        # Fetch one extra row to find out whether another page exists
+        rows = paginated_rows(db.execute(statement.limit(limit + 1)).all(), limit, response)
+    
+    # Rows are encoded directly, so headers set on `response` are passed on explicitly
+    return FastJSONResponse(expense_history(rows, compact), headers=response.headers)
+
+
+# Columns of an expense history row: the expense and its payer, read as plain
+# tuples so that no ORM objects or Pydantic models are built per row
+EXPENSE_ROW_COLUMNS = (
+    Expense.id,
+    Expense.group_id,
+    Expense.paid_by_user_id,
+    Expense.amount_cents,
+    Expense.description,
+    Expense.expense_metadata,
+    Expense.created_at,
+    User.email,
+    User.username,
+    User.full_name,
+    User.is_active,
+    User.created_at.label("paid_by_user_created_at"),
+)
+
+
+def expense_history_statement(group_id: int, cursor: Optional[str] = None):
+    """Select a group's expense rows newest first, starting after `cursor` if given."""
+    statement = (
+        select(*EXPENSE_ROW_COLUMNS)
+        .join(User, User.id == Expense.paid_by_user_id)
+        .where(Expense.group_id == group_id)
+        .order_by(Expense.created_at.desc(), Expense.id.desc())
     )
-    # Manually construct responses to avoid SQLAlchemy metadata conflict
-    return [
-        ExpenseResponse(
-            id=exp.id,
-            group_id=exp.group_id,
-            paid_by_user_id=exp.paid_by_user_id,
-            amount=exp.amount,
-            description=exp.description,
-            metadata=exp.expense_metadata,  # Map expense_metadata to metadata
-            created_at=exp.created_at,
-            paid_by_user=exp.paid_by_user,
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        # Keyset condition: strictly after the last row of the previous page
+        statement = statement.where(
+            or_(
+                Expense.created_at < cursor_created_at,
+                and_(Expense.created_at == cursor_created_at, Expense.id < cursor_id),
+            )
         )
-        for exp in expenses
-    ]
+    return statement
+
+
+def expense_row(row, compact: bool = False) -> dict:
+    """
+    Build an expense history entry from a row of `EXPENSE_ROW_COLUMNS`.
+    
+    The result has the same fields as `ExpenseResponse` (or
+    `CompactExpenseResponse` if `compact`); it is not validated again, since
+    every value comes straight from constrained columns.
+    """
+    expense_id, group_id, paid_by_user_id, amount_cents, description, metadata, created_at = row[:7]
+    entry = {
+        "id": expense_id,
+        "group_id": group_id,
+        "paid_by_user_id": paid_by_user_id,
+        "amount": from_cents(amount_cents),
+        "description": description,
+        "metadata": metadata,
+        "created_at": created_at,
+    }
+    if not compact:
+        entry["paid_by_user"] = payer_row(row)
+    return entry
+
+
+def payer_row(row) -> dict:
+    """Build the `UserResponse` fields of the payer in a row of `EXPENSE_ROW_COLUMNS`."""
+    email, username, full_name, is_active, created_at = row[7:]
+    return {
+        "email": email,
+        "username": username,
+        "full_name": full_name,
+        "id": row[2],
+        "is_active": is_active,
+        "created_at": created_at,
+    }
+
+
+def expense_history(rows: Iterable, compact: bool = False) -> Union[List[dict], dict]:
+    """Build a list of expenses, or a `CompactExpenseHistory` dict listing each payer once."""
+    if not compact:
+        return [expense_row(row) for row in rows]
+    
+    expenses = []
+    users = {}
+    for row in rows:
+        expenses.append(expense_row(row, compact=True))
+        # JSON object keys are strings
+        payer_key = str(row[2])
+        if payer_key not in users:
+            users[payer_key] = payer_row(row)
+    return {"expenses": expenses, "users": users}
+
+
+def paginated_rows(rows: List, limit: int, response: Response) -> List:
+    """Trim a limit + 1 row fetch to one page, setting X-Next-Cursor if more rows exist."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return rows
+
+
+def ndjson_lines(rows: Iterable) -> bytes:
+    """Encode expense rows as a chunk of NDJSON lines."""
+    return b"".join(dumps(expense_row(row)) + b"\n" for row in rows)
+
+
+def _stream_expenses(db: Session, statement) -> Iterator[bytes]:
+    """
+    Yield expenses as NDJSON, fetching rows in batches from a server-side cursor.
+    
+    Each batch is sent as one chunk, which keeps per-chunk overhead (and the
+    compression flush after each chunk) low.
+    """
+    result = db.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+    for rows in result.partitions():
+        yield ndjson_lines(rows)
 
 
 @router.get("/group/{group_id}/balance", response_model=GroupBalanceSummary)
 def get_group_balance_summary(
     group_id: int,
-    current_user: User = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
+    group: Group = Depends(get_member_group),
     db: Session = Depends(get_db),
 ):
-    """Summarize balance by amount owed to members (assuming equal share in each expense)."""
-    # Check if group exists
-    group = db.query(Group).filter(Group.id == group_id).first()
-    if not group:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found"
-        )
+    """Summarize balance by amount owed to members, from the shares stored for each expense."""
+    etag = group_etag(group, "balance")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers["ETag"] = etag
     
-    # Check if current user is a member
-    member = (
-        db.query(GroupMember)
-        .filter(
-            GroupMember.group_id == group_id,
-            GroupMember.user_id == current_user.id
-        )
-        .first()
-    )
-    if not member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You must be a member of the group to view balance summary"
+    summary = get_cached_balance_summary(group)
+    if summary is None:
+        summary = GroupBalanceSummary(
+            group_id=group_id,
+            group=group,
+            balances=group_balances(db, group_id),
         )
+        cache_balance_summary(group, summary)
+    return summary
+
+
+@router.get("/group/{group_id}/settlements", response_model=SettlementPlan)
+def get_group_settlements(
+    group_id: int,
+    exact: bool = False,
+    group: Group = Depends(get_member_group),
+    db: Session = Depends(get_db),
+):
+    """
+    Suggest who should pay whom to settle all balances in the group.
     
-    # Get all members of the group
-    members = (
-        db.query(GroupMember)
-        .filter(GroupMember.group_id == group_id)
-        .all()
-    )
-    member_ids = [m.user_id for m in members]
+    - **exact**: Find the plan with the fewest possible transfers. Only used for
+      groups with a small number of unsettled members; larger groups fall back
+      to the greedy plan.
+    """
+    net_cents = {
+        balance.user_id: to_cents(balance.net_balance)
+        for balance in group_balances(db, group_id)
+    }
+    unsettled = sum(1 for cents in net_cents.values() if cents)
+    if exact and unsettled <= EXACT_MAX_PARTICIPANTS:
+        method, transfers = "exact", exact_settlements(net_cents)
+    else:
+        method, transfers = "greedy", greedy_settlements(net_cents)
     
-    # Get all expenses for the group
-    expenses = (
-        db.query(Expense)
-        .filter(Expense.group_id == group_id)
-        .all()
+    return SettlementPlan(
+        group_id=group_id,
+        method=method,
+        transfers=[
+            SettlementTransfer(
+                from_user_id=transfer.from_user_id,
+                to_user_id=transfer.to_user_id,
+                amount=from_cents(transfer.amount_cents),
+            )
+            for transfer in transfers
+        ],
     )
+
+
+def group_balances(db: Session, group_id: int) -> List[BalanceSummary]:
+    """Build the balance summary of every member of a group."""
+    # Read paid and share totals from the ledger
+    ledger = get_group_ledger(db, group_id)
     
-    # Calculate balances
-    # For each expense, split equally among all members
-    # Track: how much each user paid, how much each user owes
-    paid_amounts = defaultdict(float)  # user_id -> total paid
-    owed_amounts = defaultdict(float)  # user_id -> total owed (their share)
-    
-    for expense in expenses:
-        paid_amounts[expense.paid_by_user_id] += expense.amount
-        share_per_person = expense.amount / len(member_ids)
-        for member_id in member_ids:
-            owed_amounts[member_id] += share_per_person
+    # Load all members' users in one query
+    users = {
+        user.id: user
+        for user in (
+            db.query(User)
+            .join(GroupMember, GroupMember.user_id == User.id)
+            .filter(GroupMember.group_id == group_id)
+        )
+    }
     
     # Calculate net balance for each user
     balances = []
-    for member in members:
-        user = db.query(User).filter(User.id == member.user_id).first()
-        total_owed = paid_amounts[member.user_id]  # Amount they paid
-        total_owes = owed_amounts[member.user_id]  # Amount they owe
+    for entry in ledger:
+        user = users[entry.user_id]
+        total_owed = entry.paid_cents  # Amount they paid
+        total_owes = entry.share_cents  # Amount they owe
         net_balance = total_owed - total_owes  # Positive = others owe them, negative = they owe others
         
         balance = BalanceSummary(
-            user_id=member.user_id,
+            user_id=entry.user_id,
             user=user,
-            total_owed=round(total_owed, 2),
-            total_owes=round(total_owes, 2),
-            net_balance=round(net_balance, 2),
+            total_owed=from_cents(total_owed),
+            total_owes=from_cents(total_owes),
+            net_balance=from_cents(net_balance),
         )
         balances.append(balance)
     
-    return GroupBalanceSummary(
-        group_id=group_id,
-        group=group,
-        balances=balances,
-    )
-
+    return balances
@@ -1,9 +1,15 @@
 """Group management routes."""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List
 
-from app.database import get_db
+from app.balance_cache import invalidate_group_balances
+from app.database import get_db, write_transaction
+from app.dependencies import get_member_group
+from app.etags import bump_group_version, group_etag, not_modified
+from app.ledger import record_member, record_members
 from app.models import Group, GroupMember, User
 from app.schemas import (
     GroupCreate,
@@ -11,13 +17,25 @@ from app.schemas import (
     GroupWithMembers,
     GroupMemberResponse,
     AddMemberRequest,
+    BulkAddMembersRequest,
+    BulkAddMemberResult,
+    BulkAddMembersResponse,
 )
 from app.auth import get_current_active_user
 
 router = APIRouter(prefix="/groups", tags=["groups"])
 
+# Members and their users are serialised with every group; load them up front
+# in one statement each instead of lazily per group and per member
+WITH_MEMBERS = selectinload(Group.members).selectinload(GroupMember.user)
 
-@router.post("", response_model=GroupResponse, status_code=status.HTTP_201_CREATED)
+
+@router.post(
+    "",
+    response_model=GroupResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(write_transaction)],
+)
 def create_group(
     group: GroupCreate,
     current_user: User = Depends(get_current_active_user),
@@ -30,13 +48,14 @@ def create_group(
         created_by_user_id=current_user.id,
     )
     db.add(db_group)
-    db.commit()
-    db.refresh(db_group)
+    db.flush()  # Assign the group id; group and membership commit as one transaction
     
     # Add creator as a member
     member = GroupMember(group_id=db_group.id, user_id=current_user.id)
     db.add(member)
+    record_member(db, db_group.id, current_user.id)
     db.commit()
+    db.refresh(db_group)
     
     return db_group
 
@@ -51,6 +70,7 @@ def get_my_groups(
         db.query(Group)
         .join(GroupMember)
         .filter(GroupMember.user_id == current_user.id)
+        .options(WITH_MEMBERS)
         .all()
     )
     return groups
@@ -59,66 +79,43 @@ def get_my_groups(
 @router.get("/{group_id}", response_model=GroupWithMembers)
 def get_group(
     group_id: int,
-    current_user: User = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
+    group: Group = Depends(get_member_group),
     db: Session = Depends(get_db),
 ):
-    """Get a specific group by ID."""
-    group = db.query(Group).filter(Group.id == group_id).first()
-    if not group:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found"
-        )
+    """Get a specific group by ID. Honours `If-None-Match` with the group's ETag."""
+    etag = group_etag(group, "group")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers["ETag"] = etag
     
-    # Check if user is a member
-    member = (
+    # The group is already loaded; fetch its members and their users in one query
+    members = (
         db.query(GroupMember)
-        .filter(
-            GroupMember.group_id == group_id,
-            GroupMember.user_id == current_user.id
-        )
-        .first()
+        .options(joinedload(GroupMember.user))
+        .filter(GroupMember.group_id == group.id)
+        .order_by(GroupMember.id)
+        .all()
     )
-    if not member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You are not a member of this group"
-        )
-    
+    set_committed_value(group, "members", members)
     return group
 
 
-@router.post("/{group_id}/members", response_model=GroupMemberResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{group_id}/members",
+    response_model=GroupMemberResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(write_transaction)],
+)
 def add_member_to_group(
     group_id: int,
     request: AddMemberRequest,
-    current_user: User = Depends(get_current_active_user),
+    group: Group = Depends(get_member_group),
     db: Session = Depends(get_db),
 ):
     """Add a user to a group as a member."""
-    # Check if group exists
-    group = db.query(Group).filter(Group.id == group_id).first()
-    if not group:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found"
-        )
-    
-    # Check if current user is a member (required to add others)
-    current_member = (
-        db.query(GroupMember)
-        .filter(
-            GroupMember.group_id == group_id,
-            GroupMember.user_id == current_user.id
-        )
-        .first()
-    )
-    if not current_member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You must be a member of the group to add members"
-        )
-    
     # Check if user exists by email
     user = db.query(User).filter(User.email == request.email).first()
     if not user:
@@ -147,10 +144,76 @@ def add_member_to_group(
     # Add member
     member = GroupMember(group_id=group_id, user_id=user_id)
     db.add(member)
+    record_member(db, group_id, user_id)
+    bump_group_version(db, group_id)
     db.commit()
+    invalidate_group_balances(group_id)
     db.refresh(member)
     
     # Load user relationship
     db.refresh(member.user)
     return member
 
+
+@router.post(
+    "/{group_id}/members/bulk",
+    response_model=BulkAddMembersResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(write_transaction)],
+)
+def add_members_to_group(
+    group_id: int,
+    request: BulkAddMembersRequest,
+    group: Group = Depends(get_member_group),
+    db: Session = Depends(get_db),
+):
+    """
+    Add many users to a group by email in one transaction.
+    
+    Each email is reported as `added`, `already_member`, `not_found`, or
+    `duplicate` (repeated earlier in the same request).
+    """
+    # Resolve all emails in one query
+    user_ids_by_email = dict(
+        db.query(User.email, User.id).filter(User.email.in_(set(request.emails)))
+    )
+    
+    # Find which of those users are already members in one query
+    existing_user_ids = {
+        user_id
+        for (user_id,) in db.query(GroupMember.user_id).filter(
+            GroupMember.group_id == group_id,
+            GroupMember.user_id.in_(set(user_ids_by_email.values())),
+        )
+    }
+    
+    results = []
+    seen = set()
+    new_user_ids = []
+    for email in request.emails:
+        user_id = user_ids_by_email.get(email)
+        if email in seen:
+            outcome = "duplicate"
+        elif user_id is None:
+            outcome = "not_found"
+        elif user_id in existing_user_ids:
+            outcome = "already_member"
+        else:
+            outcome = "added"
+            new_user_ids.append(user_id)
+        seen.add(email)
+        results.append(BulkAddMemberResult(email=email, status=outcome, user_id=user_id))
+    
+    # Add the new members in bulk
+    if new_user_ids:
+        db.execute(
+            insert(GroupMember),
+            [{"group_id": group_id, "user_id": user_id} for user_id in new_user_ids],
+        )
+        record_members(db, group_id, new_user_ids)
+        bump_group_version(db, group_id)
+        db.commit()
+        invalidate_group_balances(group_id)
+    
+    return BulkAddMembersResponse(group_id=group_id, added=len(new_user_ids), results=results)
+
@@ -3,9 +3,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
+from app.database import get_db, write_transaction
+from app.etags import bump_user_group_versions
+from app.ledger import get_user_ledger
 from app.models import User
-from app.schemas import UserResponse, UserBase
+from app.money import from_cents
+from app.schemas import GroupNetBalance, UserBalanceSummary, UserResponse, UserBase
 from app.auth import get_current_active_user
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -17,7 +20,7 @@ def get_my_profile(current_user: User = Depends(get_current_active_user)):
     return current_user
 
 
-@router.put("/me", response_model=UserResponse)
+@router.put("/me", response_model=UserResponse, dependencies=[Depends(write_transaction)])
 def update_my_profile(
     user_update: UserBase,
     current_user: User = Depends(get_current_active_user),
@@ -46,11 +49,45 @@ def update_my_profile(
     current_user.email = user_update.email
     current_user.full_name = user_update.full_name
     
+    # Member details appear in group reads, so their ETags must change
+    bump_user_group_versions(db, current_user.id)
     db.commit()
     db.refresh(current_user)
     return current_user
 
 
+def user_balance_summary(user_id: int, rows: list) -> UserBalanceSummary:
+    """Build a user's balance summary from their ledger rows."""
+    # Sum in cents so the overall totals are exact
+    total_paid = sum(row.paid_cents for row in rows)
+    total_share = sum(row.share_cents for row in rows)
+    return UserBalanceSummary(
+        user_id=user_id,
+        total_owed=from_cents(total_paid),
+        total_owes=from_cents(total_share),
+        net_balance=from_cents(total_paid - total_share),
+        groups=[
+            GroupNetBalance(
+                group_id=row.group_id,
+                group_name=row.group_name,
+                total_owed=from_cents(row.paid_cents),
+                total_owes=from_cents(row.share_cents),
+                net_balance=from_cents(row.paid_cents - row.share_cents),
+            )
+            for row in rows
+        ],
+    )
+
+
+@router.get("/me/balances", response_model=UserBalanceSummary)
+def get_my_balances(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """Summarize the current user's balance in every group and overall."""
+    return user_balance_summary(current_user.id, get_user_ledger(db, current_user.id))
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(
     user_id: int,
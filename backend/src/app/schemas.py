@@ -1,7 +1,9 @@
 """Pydantic schemas for request/response validation."""
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from typing import Dict, Literal, Optional, List
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_validator, model_validator
+
+from app.money import MAX_AMOUNT, from_cents, to_cents
 
 
 # User Schemas
@@ -87,40 +89,148 @@ class AddMemberRequest(BaseModel):
     email: EmailStr
 
 
+class BulkAddMembersRequest(BaseModel):
+    """Schema for adding many members to a group at once."""
+    emails: List[EmailStr] = Field(..., min_length=1, max_length=5000)
+
+
+class BulkAddMemberResult(BaseModel):
+    """Outcome of adding one email in a bulk member add."""
+    email: str
+    status: Literal["added", "already_member", "not_found", "duplicate"]
+    user_id: Optional[int] = None
+
+
+class BulkAddMembersResponse(BaseModel):
+    """Schema for the result of a bulk member add."""
+    group_id: int
+    added: int
+    results: List[BulkAddMemberResult]
+
+
 # Expense Schemas
+class SplitParticipant(BaseModel):
+    """A participant in an expense split and their weight, amount or percentage."""
+    user_id: int
+    value: Optional[float] = Field(None, ge=0, le=MAX_AMOUNT)
+
+
+class ExpenseSplit(BaseModel):
+    """
+    How an expense is divided among participants.
+    
+    - **equal**: equal shares; `value` is ignored
+    - **weight**: shares proportional to each `value`
+    - **amount**: each `value` is a fixed amount; they must add up to the expense amount
+    - **percentage**: each `value` is a percentage; they must add up to 100
+    
+    Without participants, an equal split covers all current group members.
+    """
+    method: Literal["equal", "weight", "amount", "percentage"] = "equal"
+    participants: List[SplitParticipant] = Field(default_factory=list, max_length=10000)
+    
+    @model_validator(mode="after")
+    def check_participants(self) -> "ExpenseSplit":
+        """Check participants are unique and have the values the method needs."""
+        user_ids = [participant.user_id for participant in self.participants]
+        if len(set(user_ids)) != len(user_ids):
+            raise ValueError("Split participants must be unique")
+        if self.method == "equal":
+            return self
+        if not self.participants:
+            raise ValueError(f"A {self.method} split needs participants")
+        values = [participant.value for participant in self.participants]
+        if any(value is None for value in values):
+            raise ValueError(f"Every participant in a {self.method} split needs a value")
+        if self.method == "weight" and sum(values) <= 0:
+            raise ValueError("Split weights must not all be zero")
+        if self.method == "percentage" and abs(sum(values) - 100) > 1e-6:
+            raise ValueError("Split percentages must add up to 100")
+        return self
+
+
 class ExpenseBase(BaseModel):
     """Base expense schema."""
-    amount: float = Field(..., gt=0)
+    amount: float = Field(..., gt=0, le=MAX_AMOUNT)
     description: Optional[str] = None
     expense_metadata: Optional[str] = Field(None, alias="metadata")  # Accept "metadata" in API
+    split: Optional[ExpenseSplit] = None  # Defaults to an equal split among all members
     
     model_config = ConfigDict(populate_by_name=True)  # Allow both field name and alias
+    
+    @field_validator("amount")
+    @classmethod
+    def round_to_cents(cls, value: float) -> float:
+        """Amounts are stored in whole cents."""
+        cents = to_cents(value)
+        if cents <= 0:
+            raise ValueError("Amount must be at least 0.01")
+        return from_cents(cents)
 
 
 class ExpenseCreate(ExpenseBase):
     """Schema for expense creation."""
     group_id: int
     paid_by_user_id: int
-    amount: float
+    amount: float = Field(..., gt=0, le=MAX_AMOUNT)
     description: Optional[str] = None
     expense_metadata: Optional[str] = Field(None, alias="metadata")  # Accept "metadata" in API
 
     
 
-class ExpenseResponse(BaseModel):
-    """Schema for expense response."""
+class CompactExpenseResponse(BaseModel):
+    """Schema for an expense whose payer is only referenced by id."""
     id: int
     group_id: int
     paid_by_user_id: int
-    amount: float
+    amount: float = Field(..., gt=0, le=MAX_AMOUNT)
     description: Optional[str] = None
     metadata: Optional[str] = None  # This will be populated from expense_metadata
     created_at: datetime
-    paid_by_user: UserResponse
     
     model_config = ConfigDict(from_attributes=True)
 
 
+class ExpenseResponse(CompactExpenseResponse):
+    """Schema for expense response."""
+    paid_by_user: UserResponse
+
+
+class CompactExpenseHistory(BaseModel):
+    """Schema for expense history with each payer included once, keyed by user id."""
+    expenses: List[CompactExpenseResponse]
+    users: Dict[int, UserResponse]
+
+
+class ExpenseBatchItem(ExpenseBase):
+    """Schema for one expense in a batch."""
+    paid_by_user_id: int
+
+
+class ExpenseBatchCreate(BaseModel):
+    """Schema for creating many expenses in one group at once."""
+    group_id: int
+    mode: Literal["all_or_nothing", "best_effort"] = "all_or_nothing"
+    expenses: List[ExpenseBatchItem] = Field(..., min_length=1, max_length=5000)
+
+
+class ExpenseBatchItemResult(BaseModel):
+    """Schema for the outcome of one expense in a batch."""
+    index: int
+    status: Literal["created", "failed", "skipped"]  # skipped: valid, but the batch was rejected
+    expense_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ExpenseBatchResponse(BaseModel):
+    """Schema for batch expense creation results."""
+    group_id: int
+    mode: str
+    created: int
+    failed: int
+    results: List[ExpenseBatchItemResult]
+
+
 # Balance Summary Schemas
 class BalanceSummary(BaseModel):
     """Schema for balance summary."""
@@ -137,3 +247,36 @@ class GroupBalanceSummary(BaseModel):
     group: GroupResponse
     balances: List[BalanceSummary]
 
+
+
+class GroupNetBalance(BaseModel):
+    """Schema for a user's balance in one group."""
+    group_id: int
+    group_name: str
+    total_owed: float
+    total_owes: float
+    net_balance: float
+
+
+class UserBalanceSummary(BaseModel):
+    """Schema for a user's net position across all their groups."""
+    user_id: int
+    total_owed: float
+    total_owes: float
+    net_balance: float  # positive = owed to user, negative = user owes
+    groups: List[GroupNetBalance]
+
+
+# Settlement Schemas
+class SettlementTransfer(BaseModel):
+    """Schema for a single settlement payment."""
+    from_user_id: int
+    to_user_id: int
+    amount: float
+
+
+class SettlementPlan(BaseModel):
+    """Schema for a group settlement plan."""
+    group_id: int
+    method: str  # "greedy" or "exact"
+    transfers: List[SettlementTransfer]
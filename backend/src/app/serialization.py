@@ -0,0 +1,40 @@
+"""Fast JSON encoding for large responses.
+
+Routes that already hold plain dicts and lists (rather than Pydantic
+models) return ``FastJSONResponse`` to skip FastAPI's response model
+validation. Encoding uses orjson when it is installed (``uv sync --extra
+speedups``) and the standard library otherwise; both produce the same JSON
+that the Pydantic models would.
+"""
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as compact UTF-8 JSON, with datetimes in ISO 8601."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with `dumps`, for content that needs no validation."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,104 @@
+"""Settlement planning: turn net balances into a short list of transfers."""
+import heapq
+from typing import Dict, List, NamedTuple
+
+# The exact solver is exponential in the number of non-zero balances
+EXACT_MAX_PARTICIPANTS = 14
+
+
+class Transfer(NamedTuple):
+    """A single payment from a debtor to a creditor, in cents."""
+    from_user_id: int
+    to_user_id: int
+    amount_cents: int
+
+
+def _normalise(net_cents: Dict[int, int]) -> Dict[int, int]:
+    """Drop settled members and absorb any rounding residue so balances sum to zero."""
+    balances = {user_id: cents for user_id, cents in net_cents.items() if cents}
+    residue = sum(balances.values())
+    if residue and balances:
+        # Charge the residue to the member with the largest balance on the same side
+        user_id = max(balances, key=lambda uid: (balances[uid] * residue, -uid))
+        balances[user_id] -= residue
+        if not balances[user_id]:
+            del balances[user_id]
+    return balances
+
+
+def greedy_settlements(net_cents: Dict[int, int]) -> List[Transfer]:
+    """
+    Settle balances by repeatedly paying the largest creditor from the largest debtor.
+
+    Every transfer clears at least one member, so at most n - 1 transfers are
+    produced, in O(n log n) time.
+    """
+    balances = _normalise(net_cents)
+    creditors = [(-cents, user_id) for user_id, cents in balances.items() if cents > 0]
+    debtors = [(cents, user_id) for user_id, cents in balances.items() if cents < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers = []
+    while creditors and debtors:
+        credit, creditor_id = heapq.heappop(creditors)
+        debt, debtor_id = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append(Transfer(debtor_id, creditor_id, amount))
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor_id))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor_id))
+    return transfers
+
+
+def exact_settlements(net_cents: Dict[int, int]) -> List[Transfer]:
+    """
+    Settle balances with the minimum possible number of transfers.
+
+    The minimum is n - k, where k is the largest number of disjoint zero-sum
+    subsets the balances can be partitioned into. The partition is found with
+    a dynamic program over subsets, then each subset is settled greedily.
+    """
+    balances = _normalise(net_cents)
+    user_ids = sorted(balances)
+    n = len(user_ids)
+    if n > EXACT_MAX_PARTICIPANTS:
+        raise ValueError(
+            f"Exact settlement supports at most {EXACT_MAX_PARTICIPANTS} unsettled members"
+        )
+
+    full = (1 << n) - 1
+    subset_sum = [0] * (full + 1)
+    zero_groups = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        low_bit = mask & -mask
+        subset_sum[mask] = subset_sum[mask ^ low_bit] + balances[user_ids[low_bit.bit_length() - 1]]
+        best = 0
+        remaining = mask
+        while remaining:
+            bit = remaining & -remaining
+            best = max(best, zero_groups[mask ^ bit])
+            remaining ^= bit
+        zero_groups[mask] = best + (1 if subset_sum[mask] == 0 else 0)
+
+    # Walk back from the full set; zero-sum masks on the path delimit the subsets
+    transfers = []
+    mask = full
+    group_start = full
+    while mask:
+        remaining = mask
+        best_bit = 0
+        while remaining:
+            bit = remaining & -remaining
+            if not best_bit or zero_groups[mask ^ bit] > zero_groups[mask ^ best_bit]:
+                best_bit = bit
+            remaining ^= bit
+        mask ^= best_bit
+        if subset_sum[mask] == 0:
+            subset = group_start ^ mask
+            transfers.extend(greedy_settlements({
+                user_ids[i]: balances[user_ids[i]] for i in range(n) if subset >> i & 1
+            }))
+            group_start = mask
+    return transfers
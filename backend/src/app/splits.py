@@ -0,0 +1,48 @@
+"""Turn an expense split request into per-participant shares in cents."""
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import GroupMember
+from app.money import split_cents, split_weighted, to_cents
+from app.schemas import ExpenseSplit
+
+
+def group_member_ids(db: Session, group_id: int) -> List[int]:
+    """Get the user ids of a group's members, in the order they joined."""
+    return [
+        user_id
+        for (user_id,) in db.query(GroupMember.user_id)
+        .filter(GroupMember.group_id == group_id)
+        .order_by(GroupMember.id)
+    ]
+
+
+def expense_shares(
+    amount_cents: int, split: Optional[ExpenseSplit], member_ids: List[int]
+) -> Dict[int, int]:
+    """
+    Compute each participant's share of an expense, in cents.
+
+    `member_ids` are the group's members in join order; without a split or
+    participants the expense is shared equally among all of them. The shares
+    always sum to `amount_cents`. Raises ValueError if the split is invalid
+    for this expense.
+    """
+    if split is None or not split.participants:
+        return dict(zip(member_ids, split_cents(amount_cents, len(member_ids))))
+
+    user_ids = [participant.user_id for participant in split.participants]
+    if not set(user_ids) <= set(member_ids):
+        raise ValueError("Split participants must be members of the group")
+    values = [participant.value for participant in split.participants]
+
+    if split.method == "equal":
+        shares = split_cents(amount_cents, len(user_ids))
+    elif split.method == "amount":
+        shares = [to_cents(value) for value in values]
+        if sum(shares) != amount_cents:
+            raise ValueError("Split amounts must add up to the expense amount")
+    else:
+        shares = split_weighted(amount_cents, values)
+    return dict(zip(user_ids, shares))
@@ -0,0 +1,64 @@
+"""SQLite performance profile.
+
+Every new SQLite connection gets the pragmas configured in Settings: WAL
+journal (readers no longer block on the writer), ``synchronous=NORMAL``
+(safe with WAL, with no fsync per commit), a busy timeout, a larger page
+cache, memory-mapped I/O and in-memory temporary tables.
+
+SQLite allows one writer at a time. A transaction that starts with a
+plain (deferred) ``BEGIN``, reads, and then writes cannot wait for the
+write lock: if another connection is writing, it fails at once with
+"database is locked", whatever the busy timeout. Write requests therefore
+start their transaction with ``BEGIN IMMEDIATE`` (see
+``app.database.write_transaction``). This takes the write lock up front,
+so concurrent writers queue on the busy timeout instead of failing. Read
+transactions keep the deferred ``BEGIN`` and never wait.
+"""
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+# Execution option read by the "begin" handler, e.g. {"sqlite_begin": "IMMEDIATE"}
+BEGIN_MODE_OPTION = "sqlite_begin"
+
+_BEGIN_MODES = {"DEFERRED", "IMMEDIATE", "EXCLUSIVE"}
+
+
+def sqlite_pragmas() -> Dict[str, str]:
+    """Get the pragmas applied to each new connection, in order."""
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": str(int(settings.sqlite_busy_timeout_ms)),
+        # A negative cache_size is in KiB rather than pages
+        "cache_size": str(-int(settings.sqlite_cache_size_kib)),
+        "mmap_size": str(int(settings.sqlite_mmap_size_bytes)),
+        "temp_store": settings.sqlite_temp_store,
+    }
+
+
+def configure_sqlite(engine: Engine) -> None:
+    """Apply the performance profile and BEGIN handling to a SQLite engine."""
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        # Stop the driver from emitting its own BEGIN, so `begin_transaction` can
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def begin_transaction(conn):
+        mode = conn.get_execution_options().get(BEGIN_MODE_OPTION)
+        if mode is None or not settings.sqlite_immediate_writes:
+            conn.exec_driver_sql("BEGIN")
+            return
+        if mode.upper() not in _BEGIN_MODES:
+            raise ValueError(f"Unknown SQLite transaction mode: {mode!r}")
+        conn.exec_driver_sql(f"BEGIN {mode.upper()}")
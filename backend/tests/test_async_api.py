@@ -0,0 +1,148 @@
+"""Tests for the async database mode routes."""
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, status  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.auth import create_access_token, principal_cache  # noqa: E402
+from app.balance_cache import balance_cache  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.database_async import get_async_db, to_async_url  # noqa: E402
+from app.models import User  # noqa: E402
+from app.routers import async_expenses, async_groups, async_users  # noqa: E402
+
+PREFIX = "/api/async/v1"
+
+
+@pytest.fixture
+async def async_client():
+    """Create an app serving only the async routes on an in-memory database."""
+    principal_cache.clear()
+    balance_cache.clear()
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+    async with session_factory() as db:
+        db.add_all([
+            User(email="test@example.com", username="testuser", hashed_password="x"),
+            User(email="other@example.com", username="otheruser", hashed_password="x"),
+        ])
+        await db.commit()
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    for module in (async_users, async_groups, async_expenses):
+        app.include_router(module.router, prefix=PREFIX)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as client:
+        yield client
+    await engine.dispose()
+
+
+def test_to_async_url():
+    """Test sync URLs are mapped to async drivers."""
+    assert to_async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert to_async_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+
+async def test_async_group_expense_flow(async_client):
+    """Test creating a group, adding a member and an expense through async routes."""
+    response = await async_client.post(f"{PREFIX}/groups", json={"name": "Async Group"})
+    assert response.status_code == status.HTTP_201_CREATED
+    group_id = response.json()["id"]
+
+    response = await async_client.post(
+        f"{PREFIX}/groups/{group_id}/members", json={"email": "other@example.com"}
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["user"]["username"] == "otheruser"
+
+    response = await async_client.post(
+        f"{PREFIX}/expenses",
+        json={"group_id": group_id, "paid_by_user_id": 1, "amount": 80.0},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["paid_by_user"]["id"] == 1
+
+    response = await async_client.get(f"{PREFIX}/groups/{group_id}")
+    assert len(response.json()["members"]) == 2
+
+    response = await async_client.get(f"{PREFIX}/groups")
+    assert [g["id"] for g in response.json()] == [group_id]
+
+    response = await async_client.get(f"{PREFIX}/expenses/group/{group_id}", params={"limit": 1})
+    assert [e["amount"] for e in response.json()] == [80.0]
+
+    response = await async_client.get(f"{PREFIX}/expenses/group/{group_id}", params={"format": "ndjson"})
+    assert len(response.text.splitlines()) == 1
+
+    response = await async_client.get(f"{PREFIX}/expenses/group/{group_id}", params={"compact": "true"})
+    assert list(response.json()["users"]) == ["1"]
+
+    response = await async_client.get(f"{PREFIX}/expenses/group/{group_id}/balance")
+    balances = {b["user_id"]: b["net_balance"] for b in response.json()["balances"]}
+    assert balances == {1: 40.0, 2: -40.0}
+
+    response = await async_client.get(f"{PREFIX}/users/me/balances")
+    assert response.json()["net_balance"] == 40.0
+
+
+async def test_async_group_reads_honour_etags(async_client):
+    """Test async group reads send ETags and answer If-None-Match with 304."""
+    group_id = (await async_client.post(f"{PREFIX}/groups", json={"name": "Cached"})).json()["id"]
+    paths = [
+        f"{PREFIX}/groups/{group_id}",
+        f"{PREFIX}/expenses/group/{group_id}",
+        f"{PREFIX}/expenses/group/{group_id}/balance",
+    ]
+    etags = {}
+    for path in paths:
+        response = await async_client.get(path)
+        etags[path] = response.headers["ETag"]
+        response = await async_client.get(path, headers={"If-None-Match": etags[path]})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    await async_client.post(
+        f"{PREFIX}/expenses", json={"group_id": group_id, "paid_by_user_id": 1, "amount": 5.0}
+    )
+    for path in paths:
+        response = await async_client.get(path, headers={"If-None-Match": etags[path]})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etags[path]
+
+
+async def test_async_membership_required(async_client):
+    """Test async group routes enforce membership."""
+    response = await async_client.get(f"{PREFIX}/groups/999")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_async_profile_update(async_client):
+    """Test updating the profile through the async routes."""
+    response = await async_client.put(
+        f"{PREFIX}/users/me",
+        json={"email": "test@example.com", "username": "renamed"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = await async_client.get(f"{PREFIX}/users/me")
+    assert response.json()["username"] == "renamed"
+    response = await async_client.get(f"{PREFIX}/users/2")
+    assert response.json()["username"] == "otheruser"
@@ -106,3 +106,98 @@ def test_get_current_user_unauthorized(client):
     response = client.get("/api/v1/auth/me")
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+
+
+def test_current_user_served_from_principal_cache(client, auth_headers, query_counter):
+    """Test repeated requests authorize without querying the user."""
+    from app.auth import principal_cache
+
+    client.get("/api/v1/auth/me", headers=auth_headers)
+    query_counter.clear()
+    response = client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["email"] == "test@example.com"
+    assert not [s for s in query_counter if "FROM users" in s]
+    assert principal_cache.stats()["hits"] >= 1
+
+
+def test_principal_cache_invalidated_on_profile_update(client, auth_headers):
+    """Test profile changes are visible on the next request."""
+    client.get("/api/v1/users/me", headers=auth_headers)
+    client.put(
+        "/api/v1/users/me",
+        headers=auth_headers,
+        json={"email": "test@example.com", "username": "renamed"},
+    )
+    response = client.get("/api/v1/users/me", headers=auth_headers)
+    assert response.json()["username"] == "renamed"
+
+
+def test_principal_cache_invalidated_on_deactivation(client, auth_headers, test_user, db):
+    """Test a deactivated user is rejected even after being cached."""
+    client.get("/api/v1/auth/me", headers=auth_headers)
+    test_user.is_active = False
+    db.commit()
+
+    response = client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_principal_cache_invalidated_again_on_commit(client, auth_headers, test_user, db):
+    """Test a user cached between flush and commit is not served stale afterwards."""
+    from app.auth import load_principal, principal_cache
+
+    test_user.is_active = False
+    db.flush()
+    # A concurrent request misses the cache and caches the still-committed row
+    principal_cache.set(test_user.id, {"id": test_user.id, "is_active": True})
+    db.commit()
+
+    assert principal_cache.get(test_user.id) is None
+    assert load_principal(db, test_user.id).is_active is False
+
+
+def test_principal_cache_can_be_disabled(client, auth_headers, monkeypatch):
+    """Test the user is queried on every request when the cache is off."""
+    from app.auth import principal_cache
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "principal_cache_enabled", False)
+    client.get("/api/v1/auth/me", headers=auth_headers)
+    client.get("/api/v1/auth/me", headers=auth_headers)
+    assert principal_cache.stats()["hits"] == 0
+
+
+def test_password_hash_pool_rejects_when_full():
+    """Test the pool sheds work beyond its worker and queue limits."""
+    import threading
+    from app.password_hashing import PasswordHashPool, PasswordHashPoolSaturated
+
+    pool = PasswordHashPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+    running = [pool.submit(release.wait), pool.submit(release.wait)]
+    with pytest.raises(PasswordHashPoolSaturated):
+        pool.submit(release.wait)
+
+    release.set()
+    for future in running:
+        future.result(timeout=5)
+    assert pool.submit(lambda: "ok").result(timeout=5) == "ok"
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["completed"] == 3
+
+
+def test_login_returns_503_when_hash_pool_saturated(client, test_user, monkeypatch):
+    """Test logins are rejected with Retry-After when hashing is saturated."""
+    import app.auth
+    from app.password_hashing import PasswordHashPool
+
+    monkeypatch.setattr(app.auth, "password_hash_pool", PasswordHashPool(max_workers=1, max_pending=0))
+    monkeypatch.setattr(app.auth.password_hash_pool._slots, "acquire", lambda blocking=True: False)
+
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword123"},
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,70 @@
+"""Tests for the vectorised balance engine."""
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.balance_engine import balance_totals  # noqa: E402
+from app.ledger import aggregate_balances, backfill_expense_shares, rebuild_ledger, verify_ledger  # noqa: E402
+
+
+def test_vectorized_engine_matches_sql_aggregation(test_user, db):
+    """Test the NumPy engine gives exactly the same totals as the SQL aggregation."""
+    from app.models import Group, GroupMember, Expense, User
+
+    rng = random.Random(0)
+    users = [test_user] + [
+        User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="x")
+        for i in range(6)
+    ]
+    db.add_all(users)
+    groups = [Group(name=f"Group {g}", created_by_user_id=test_user.id) for g in range(3)]
+    db.add_all(groups)
+    db.flush()
+    for group, size in zip(groups, (7, 3, 1)):
+        db.add_all(GroupMember(group_id=group.id, user_id=user.id) for user in users[:size])
+    db.flush()
+    for group, size in zip(groups, (7, 3, 0)):
+        for _ in range(size * 20):
+            db.add(Expense(
+                group_id=group.id,
+                paid_by_user_id=users[rng.randrange(size)].id,
+                amount=rng.randint(1, 100_000) / 100,
+            ))
+    db.commit()
+    backfill_expense_shares(db)
+    db.commit()
+
+    expected = aggregate_balances(db)
+    assert aggregate_balances(db, engine="numpy") == expected
+    assert aggregate_balances(db, groups[1].id, engine="numpy") == aggregate_balances(db, groups[1].id)
+    assert expected[(groups[2].id, test_user.id)] == (0, 0)
+
+    rebuild_ledger(db, engine="numpy")
+    assert verify_ledger(db) == []
+
+
+def test_balance_totals_ignores_non_members():
+    """Test rows for users outside the group are dropped, as in the SQL outer join."""
+    members = np.array([[1, 10], [1, 11], [2, 10]], dtype=np.int64)
+    payments = np.array([[1, 10, 500], [2, 10, 300], [1, 99, 700]], dtype=np.int64)
+    shares = np.array([[1, 10, 250], [1, 11, 250], [2, 10, 300]], dtype=np.int64)
+
+    paid, share = balance_totals(members, payments, shares)
+    assert paid.tolist() == [500, 0, 300]
+    assert share.tolist() == [250, 250, 300]
+
+    empty = np.zeros((0, 3), dtype=np.int64)
+    paid, share = balance_totals(members, empty, empty)
+    assert paid.tolist() == share.tolist() == [0, 0, 0]
+
+
+def test_balance_totals_are_exact_beyond_float_precision():
+    """Test totals past 2**53 cents are summed exactly, as in SQL."""
+    members = np.array([[1, 10]], dtype=np.int64)
+    amounts = [2**53, 1, 1, 10**14 + 1]
+    payments = np.array([[1, 10, cents] for cents in amounts], dtype=np.int64)
+
+    paid, _ = balance_totals(members, payments, payments)
+    assert paid.tolist() == [sum(amounts)]
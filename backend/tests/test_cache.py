@@ -0,0 +1,72 @@
+"""Tests for the cache backends."""
+from app.cache import SQLiteCache, TTLCache
+
+
+class FakeClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    """Test the SQLite backend keeps the most recently used entries."""
+    clock = FakeClock()
+    cache = SQLiteCache(str(tmp_path / "cache.db"), maxsize=2, ttl=60, clock=clock)
+
+    cache.set(1, {"version": 1})
+    clock.now += 1
+    cache.set(2, {"version": 2})
+    clock.now += 1
+    assert cache.get(1) == {"version": 1}
+    clock.now += 1
+    cache.set(3, {"version": 3})
+
+    assert cache.get(2) is None
+    assert cache.get(1) == {"version": 1}
+    assert cache.get(3) == {"version": 3}
+    assert cache.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+        "expirations": 0,
+    }
+
+
+def test_sqlite_cache_expires_entries(tmp_path):
+    """Test SQLite entries expire after the TTL."""
+    clock = FakeClock()
+    cache = SQLiteCache(str(tmp_path / "cache.db"), maxsize=10, ttl=60, clock=clock)
+
+    cache.set("group", [1, 2])
+    clock.now += 59
+    assert cache.get("group") == [1, 2]
+    clock.now += 1
+    assert cache.get("group") is None
+    assert len(cache) == 0
+    assert cache.stats()["expirations"] == 1
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    """Test two caches on the same file (e.g. two workers) see each other's writes."""
+    path = str(tmp_path / "cache.db")
+    first = SQLiteCache(path, maxsize=10, ttl=60)
+    second = SQLiteCache(path, maxsize=10, ttl=60)
+
+    first.set(7, {"version": 3})
+    assert second.get(7) == {"version": 3}
+    second.delete(7)
+    assert first.get(7) is None
+
+
+def test_memory_cache_with_no_size_stores_nothing():
+    """Test a zero-size cache (the disabled backend) never stores values."""
+    cache = TTLCache(maxsize=0, ttl=0)
+    cache.set(1, "value")
+    assert cache.get(1) is None
+    assert len(cache) == 0
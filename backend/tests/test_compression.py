@@ -0,0 +1,168 @@
+"""Tests for response compression."""
+import json
+import zlib
+
+import pytest
+from fastapi import status
+
+from app.compression import CompressionMiddleware, choose_encoding
+
+
+def _group_with_history(db, test_user, count):
+    """Create a group whose expense history is large enough to be compressed."""
+    from app.models import Group, GroupMember, Expense
+
+    group = Group(name="Compressed Group", created_by_user_id=test_user.id)
+    db.add(group)
+    db.commit()
+    db.add(GroupMember(group_id=group.id, user_id=test_user.id))
+    db.add_all(
+        Expense(
+            group_id=group.id,
+            paid_by_user_id=test_user.id,
+            amount=float(i + 1),
+            description=f"Expense {i + 1}",
+        )
+        for i in range(count)
+    )
+    db.commit()
+    return group.id
+
+
+@pytest.mark.parametrize("encoding, package", [("gzip", None), ("br", "brotli"), ("zstd", "zstandard")])
+def test_large_responses_are_compressed(client, auth_headers, test_user, db, encoding, package):
+    """Test a large expense history is compressed with the requested encoding."""
+    if package:
+        pytest.importorskip(package)
+    group_id = _group_with_history(db, test_user, 50)
+
+    response = client.get(
+        f"/api/v1/expenses/group/{group_id}",
+        headers={**auth_headers, "Accept-Encoding": encoding},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 50
+    assert response.num_bytes_downloaded < len(response.content) / 3
+
+    # The ETag is weakened but still answers conditional requests
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    response = client.get(
+        f"/api/v1/expenses/group/{group_id}",
+        headers={**auth_headers, "Accept-Encoding": encoding, "If-None-Match": etag},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_small_and_unaccepted_responses_are_not_compressed(client, auth_headers, test_user, db):
+    """Test responses below the minimum size, or without Accept-Encoding, are sent as is."""
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    group_id = _group_with_history(db, test_user, 50)
+    response = client.get(
+        f"/api/v1/expenses/group/{group_id}",
+        headers={**auth_headers, "Accept-Encoding": "identity"},
+    )
+    assert "content-encoding" not in response.headers
+    assert response.headers["ETag"].startswith('"')
+
+
+def test_ndjson_stream_is_compressed(client, auth_headers, test_user, db, monkeypatch):
+    """Test a streamed expense history is compressed across several chunks."""
+    monkeypatch.setattr("app.routers.expenses.STREAM_BATCH_SIZE", 4)
+    group_id = _group_with_history(db, test_user, 10)
+
+    response = client.get(
+        f"/api/v1/expenses/group/{group_id}",
+        headers={**auth_headers, "Accept-Encoding": "gzip"},
+        params={"format": "ndjson"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["amount"] for row in rows] == [float(i) for i in range(10, 0, -1)]
+
+
+async def test_stream_chunks_are_flushed():
+    """Test each streamed chunk can be decoded as soon as it arrives."""
+    lines = [b'{"line": %d}\n' % i for i in range(3)]
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/x-ndjson"),
+        ]})
+        for line in lines:
+            await send({"type": "http.response.body", "body": line, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    await CompressionMiddleware(app, minimum_size=1024)(scope, None, send)
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for line, message in zip(lines, messages[1:]):
+        assert decompressor.decompress(message["body"]) == line
+    assert decompressor.decompress(messages[-1]["body"]) == b""
+    assert decompressor.eof
+
+
+def test_bodiless_responses_are_not_compressed(client, auth_headers, test_user, db, monkeypatch):
+    """Test 304s, HEAD requests and empty bodies are sent as they are, even with no minimum size."""
+    from app.main import app
+
+    group_id = _group_with_history(db, test_user, 3)
+    url = f"/api/v1/expenses/group/{group_id}"
+    headers = {**auth_headers, "Accept-Encoding": "gzip"}
+    etag = client.get(url, headers=headers).headers["ETag"]
+
+    # Make the app's compression middleware compress bodies of any size
+    middleware = app.middleware_stack
+    while not isinstance(middleware, CompressionMiddleware):
+        middleware = middleware.app
+    monkeypatch.setattr(middleware, "minimum_size", 0)
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert "content-encoding" not in response.headers
+    assert response.content == b""
+
+
+async def test_head_and_empty_responses_are_not_compressed():
+    """Test HEAD requests and empty bodies get no Content-Encoding with minimum_size=0."""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    for method in ("HEAD", "GET"):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": method, "headers": [(b"accept-encoding", b"gzip")]}
+        await CompressionMiddleware(app, minimum_size=0)(scope, None, send)
+        assert messages[0]["headers"] == []
+        assert messages[1]["body"] == b""
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip, br;q=0", "gzip"),
+        ("*", "br"),
+        ("*;q=0, gzip", "gzip"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_choose_encoding(accept_encoding, expected):
+    """Test the server's preferred encoding is picked among those the client accepts."""
+    assert choose_encoding(accept_encoding, ["br", "gzip"]) == expected
@@ -0,0 +1,85 @@
+"""Tests for connection pool configuration and instrumentation."""
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.db_pool import InstrumentedQueuePool, ping_idle_connections, pool_options, pool_stats
+
+
+def _engine(tmp_path, **kwargs):
+    return create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedQueuePool,
+        connect_args={"check_same_thread": False},
+        **kwargs,
+    )
+
+
+def test_pool_stats_track_checkouts_and_timeouts(tmp_path):
+    """Test the instrumented pool reports occupancy, waits and timeouts."""
+    engine = _engine(tmp_path, pool_size=1, max_overflow=0, pool_timeout=0.05)
+
+    held = engine.connect()
+    stats = pool_stats(engine.pool)
+    assert stats["checked_out"] == 1
+    assert stats["checkouts"] == 1
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    stats = pool_stats(engine.pool)
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+
+    held.close()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    stats = pool_stats(engine.pool)
+    assert stats["checked_out"] == 0
+    assert stats["checked_in"] == 1
+    assert stats["checkouts"] == 3
+
+
+def test_overflow_is_reported(tmp_path):
+    """Test connections beyond pool_size are reported as overflow."""
+    engine = _engine(tmp_path, pool_size=1, max_overflow=2)
+
+    connections = [engine.connect() for _ in range(3)]
+    assert pool_stats(engine.pool)["overflow"] == 2
+    for conn in connections:
+        conn.close()
+
+
+def test_idle_connections_are_pinged_and_replaced(tmp_path):
+    """Test an idle connection that fails the ping is swapped for a fresh one."""
+    engine = _engine(tmp_path, pool_size=1, max_overflow=0)
+    ping_idle_connections(engine, idle_seconds=0)
+
+    with engine.connect() as conn:
+        first = conn.connection.dbapi_connection
+    # Simulate the server dropping the connection while it sits in the pool
+    first.close()
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert conn.connection.dbapi_connection is not first
+
+
+def test_pool_options(monkeypatch):
+    """Test pool settings apply to server and file databases but not in-memory SQLite."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "db_pool_pre_ping", "always")
+    assert pool_options("sqlite:///:memory:") == {}
+    assert "pool_pre_ping" not in pool_options("sqlite:///./app.db")
+    options = pool_options("postgresql://localhost/app")
+    assert options["pool_pre_ping"] is True
+    assert options["pool_size"] == settings.db_pool_size
+
+    monkeypatch.setattr(settings, "db_pool_pre_ping", "sometimes")
+    with pytest.raises(ValueError):
+        pool_options("postgresql://localhost/app")
+
+
+def test_metrics_include_database_pool(client):
+    """Test the metrics endpoint publishes the pool statistics."""
+    response = client.get("/metrics")
+    assert "database_pool" in response.json()
@@ -1,4 +1,6 @@
 """Tests for expense management endpoints."""
+import json
+
 import pytest
 from fastapi import status
 
@@ -165,3 +167,542 @@ def test_get_group_balance_summary(client, auth_headers, test_user, db):
     assert other_user_balance["total_owes"] == 50.0
     assert other_user_balance["net_balance"] == -50.0
 
+
+
+def test_balance_summary_query_count_is_constant(client, auth_headers, test_user, db, query_counter):
+    """Test the balance summary does not issue a query per member."""
+    from app.balance_cache import balance_cache
+    from app.models import Group, GroupMember, Expense, User
+
+    def balance_statement_count(member_count):
+        group = Group(name=f"Group of {member_count}", created_by_user_id=test_user.id)
+        db.add(group)
+        db.commit()
+        db.add(GroupMember(group_id=group.id, user_id=test_user.id))
+        for i in range(member_count - 1):
+            user = User(
+                email=f"member{member_count}-{i}@example.com",
+                username=f"member{member_count}-{i}",
+                hashed_password="x",
+            )
+            db.add(user)
+            db.flush()
+            db.add(GroupMember(group_id=group.id, user_id=user.id))
+        db.add(Expense(group_id=group.id, paid_by_user_id=test_user.id, amount=60.0))
+        db.commit()
+
+        # Warm up the ledger so both measurements read existing entries,
+        # but measure a summary that is not cached
+        client.get(f"/api/v1/expenses/group/{group.id}/balance", headers=auth_headers)
+        balance_cache.clear()
+        query_counter.clear()
+        response = client.get(f"/api/v1/expenses/group/{group.id}/balance", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["balances"]) == member_count
+        return len(query_counter)
+
+    assert balance_statement_count(2) == balance_statement_count(20)
+
+
+def test_balance_summary_is_cached_until_the_group_changes(
+    client, auth_headers, test_user, db, query_counter
+):
+    """Test repeated balance reads are served from the cache and writes invalidate it."""
+    from app.balance_cache import balance_cache
+
+    group_id, _ = _group_with_members(client, auth_headers, db, 1)
+    url = f"/api/v1/expenses/group/{group_id}/balance"
+
+    first = client.get(url, headers=auth_headers)
+    query_counter.clear()
+    second = client.get(url, headers=auth_headers)
+    assert second.json() == first.json()
+    assert not any("group_balances" in statement for statement in query_counter)
+    assert balance_cache.stats()["hits"] == 1
+
+    # A new expense drops the cached summary
+    response = client.post(
+        "/api/v1/expenses",
+        json={"group_id": group_id, "paid_by_user_id": test_user.id, "amount": 30.0},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    balances = {b["user_id"]: b for b in client.get(url, headers=auth_headers).json()["balances"]}
+    assert balances[test_user.id]["net_balance"] == 15.0
+
+    # So does a new member
+    from app.models import User
+    newcomer = User(email="newcomer@example.com", username="newcomer", hashed_password="x")
+    db.add(newcomer)
+    db.commit()
+    response = client.post(
+        f"/api/v1/groups/{group_id}/members",
+        json={"email": "newcomer@example.com"},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    balances = client.get(url, headers=auth_headers).json()["balances"]
+    assert len(balances) == 3
+    assert balance_cache.stats()["misses"] == 3
+
+
+def test_get_group_settlements(client, auth_headers, test_user, db):
+    """Test the settlement plan for a group."""
+    from app.models import Group, GroupMember, Expense, User
+
+    group = Group(name="Test Group", created_by_user_id=test_user.id)
+    db.add(group)
+    db.commit()
+    db.refresh(group)
+    db.add(GroupMember(group_id=group.id, user_id=test_user.id))
+
+    others = []
+    for i in range(2):
+        user = User(email=f"other{i}@example.com", username=f"other{i}", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.add(GroupMember(group_id=group.id, user_id=user.id))
+        others.append(user)
+    db.flush()
+    db.add(Expense(group_id=group.id, paid_by_user_id=test_user.id, amount=90.0))
+    db.commit()
+
+    for exact in ("false", "true"):
+        response = client.get(
+            f"/api/v1/expenses/group/{group.id}/settlements?exact={exact}",
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["method"] == ("exact" if exact == "true" else "greedy")
+        transfers = sorted(
+            (t["from_user_id"], t["to_user_id"], t["amount"]) for t in data["transfers"]
+        )
+        assert transfers == [
+            (others[0].id, test_user.id, 30.0),
+            (others[1].id, test_user.id, 30.0),
+        ]
+
+
+def _group_with_expenses(db, test_user, count):
+    """Create a group with the test user and `count` expenses, and its ledger."""
+    from app.ledger import rebuild_ledger
+    from app.models import Group, GroupMember, Expense
+
+    group = Group(name="History Group", created_by_user_id=test_user.id)
+    db.add(group)
+    db.commit()
+    db.refresh(group)
+    db.add(GroupMember(group_id=group.id, user_id=test_user.id))
+    for i in range(count):
+        db.add(Expense(
+            group_id=group.id,
+            paid_by_user_id=test_user.id,
+            amount=float(i + 1),
+            description=f"Expense {i + 1}",
+        ))
+    db.commit()
+    rebuild_ledger(db, group.id)
+    return group
+
+
+def test_get_group_expenses_paginated(client, auth_headers, test_user, db):
+    """Test walking the expense history with keyset cursors."""
+    group = _group_with_expenses(db, test_user, 5)
+
+    seen = []
+    cursor = None
+    for _ in range(3):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(
+            f"/api/v1/expenses/group/{group.id}",
+            headers=auth_headers,
+            params=params,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        seen.extend(exp["id"] for exp in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+
+    assert cursor is None
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_get_group_expenses_invalid_cursor(client, auth_headers, test_user, db):
+    """Test a malformed cursor is rejected."""
+    group = _group_with_expenses(db, test_user, 1)
+
+    response = client.get(
+        f"/api/v1/expenses/group/{group.id}",
+        headers=auth_headers,
+        params={"limit": 2, "cursor": "not-a-cursor"},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_group_expenses_cursor_id_out_of_range(client, auth_headers, test_user, db):
+    """Test cursors with row ids that are not BIGINT-sized integers are rejected."""
+    import base64
+
+    group = _group_with_expenses(db, test_user, 1)
+
+    for row_id in (10**30, 0, -1, True, 1.5, "1"):
+        payload = json.dumps(["2024-01-01T00:00:00", row_id]).encode("utf-8")
+        response = client.get(
+            f"/api/v1/expenses/group/{group.id}",
+            headers=auth_headers,
+            params={"limit": 5, "cursor": base64.urlsafe_b64encode(payload).decode("ascii")},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_get_group_expenses_ndjson(client, auth_headers, test_user, db):
+    """Test streaming the expense history as NDJSON."""
+    import json
+
+    group = _group_with_expenses(db, test_user, 3)
+
+    response = client.get(
+        f"/api/v1/expenses/group/{group.id}",
+        headers=auth_headers,
+        params={"format": "ndjson"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["amount"] for row in rows] == [3.0, 2.0, 1.0]
+    assert rows[0]["paid_by_user"]["id"] == test_user.id
+
+    response = client.get(
+        f"/api/v1/expenses/group/{group.id}",
+        headers=auth_headers,
+        params={"format": "ndjson", "limit": 2},
+    )
+    assert [json.loads(line)["amount"] for line in response.text.splitlines()] == [3.0, 2.0]
+
+
+def test_get_group_expenses_compact(client, auth_headers, test_user, db):
+    """Test the compact history lists each payer once and references them by id."""
+    group_id, member_ids = _group_with_members(client, auth_headers, db, 1)
+    for i, payer_id in enumerate([test_user.id, member_ids[0], test_user.id]):
+        client.post(
+            "/api/v1/expenses",
+            json={"group_id": group_id, "paid_by_user_id": payer_id, "amount": 10.0 + i},
+            headers=auth_headers,
+        )
+    url = f"/api/v1/expenses/group/{group_id}"
+    full = client.get(url, headers=auth_headers).json()
+
+    response = client.get(url, headers=auth_headers, params={"compact": "true"})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert set(data["users"]) == {str(test_user.id), str(member_ids[0])}
+    assert [
+        {**expense, "paid_by_user": data["users"][str(expense["paid_by_user_id"])]}
+        for expense in data["expenses"]
+    ] == full
+
+    # A page only includes the payers it references
+    response = client.get(url, headers=auth_headers, params={"compact": "true", "limit": 1})
+    assert list(response.json()["users"]) == [str(test_user.id)]
+    assert "X-Next-Cursor" in response.headers
+
+    response = client.get(url, headers=auth_headers, params={"compact": "true", "format": "ndjson"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_expense_history_matches_response_model(
+    client, auth_headers, test_user, db, monkeypatch, use_orjson
+):
+    """Test the row-based history encodes exactly like ExpenseResponse, with or without orjson."""
+    from app import serialization
+    from app.models import Expense
+    from app.routers.expenses import expense_response
+
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    group = _group_with_expenses(db, test_user, 3)
+    db.query(Expense).filter(Expense.amount_cents == 200).update(
+        {"description": "Caf\u00e9 \u2615", "expense_metadata": '{"tip": 1}'}
+    )
+    db.commit()
+
+    response = client.get(f"/api/v1/expenses/group/{group.id}", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    expenses = (
+        db.query(Expense)
+        .filter(Expense.group_id == group.id)
+        .order_by(Expense.created_at.desc(), Expense.id.desc())
+    )
+    assert response.json() == [
+        expense_response(expense).model_dump(mode="json") for expense in expenses
+    ]
+
+
+def test_create_expenses_batch(client, auth_headers, test_user, db):
+    """Test adding many expenses in one request keeps the ledger consistent."""
+    from app.ledger import verify_ledger
+
+    group = _group_with_expenses(db, test_user, 0)
+
+    response = client.post(
+        "/api/v1/expenses/batch",
+        headers=auth_headers,
+        json={
+            "group_id": group.id,
+            "expenses": [
+                {"paid_by_user_id": test_user.id, "amount": 10.0, "description": "A"},
+                {"paid_by_user_id": test_user.id, "amount": 15.5, "metadata": "{}"},
+            ],
+        },
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 0
+    assert [result["status"] for result in data["results"]] == ["created", "created"]
+    assert all(result["expense_id"] for result in data["results"])
+
+    response = client.get(f"/api/v1/expenses/group/{group.id}/balance", headers=auth_headers)
+    balance = response.json()["balances"][0]
+    assert balance["total_owed"] == 25.5
+    assert balance["net_balance"] == 0.0
+    assert verify_ledger(db, group.id) == []
+
+
+def test_create_expenses_batch_best_effort(client, auth_headers, test_user, db):
+    """Test best-effort batches create the valid expenses and report the rest."""
+    from app.models import Expense
+
+    group = _group_with_expenses(db, test_user, 0)
+
+    response = client.post(
+        "/api/v1/expenses/batch",
+        headers=auth_headers,
+        json={
+            "group_id": group.id,
+            "mode": "best_effort",
+            "expenses": [
+                {"paid_by_user_id": test_user.id, "amount": 10.0},
+                {"paid_by_user_id": test_user.id + 1000, "amount": 20.0},
+            ],
+        },
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    data = response.json()
+    assert data["created"] == 1
+    assert data["failed"] == 1
+    assert data["results"][1]["status"] == "failed"
+    assert data["results"][1]["error"] == "Paying user must be a member of the group"
+    assert db.query(Expense).filter(Expense.group_id == group.id).count() == 1
+
+    # Nothing valid: nothing is created, so the batch is rejected with every result
+    response = client.post(
+        "/api/v1/expenses/batch",
+        headers=auth_headers,
+        json={
+            "group_id": group.id,
+            "mode": "best_effort",
+            "expenses": [{"paid_by_user_id": test_user.id + 1000, "amount": 20.0}],
+        },
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    detail = response.json()["detail"]
+    assert (detail["created"], detail["failed"]) == (0, 1)
+    assert detail["results"][0]["status"] == "failed"
+    assert db.query(Expense).filter(Expense.group_id == group.id).count() == 1
+
+
+def test_create_expenses_batch_all_or_nothing(client, auth_headers, test_user, db):
+    """Test an invalid expense rejects the whole batch by default."""
+    from app.models import Expense
+
+    group = _group_with_expenses(db, test_user, 0)
+
+    response = client.post(
+        "/api/v1/expenses/batch",
+        headers=auth_headers,
+        json={
+            "group_id": group.id,
+            "expenses": [
+                {"paid_by_user_id": test_user.id, "amount": 10.0},
+                {"paid_by_user_id": test_user.id + 1000, "amount": 20.0},
+            ],
+        },
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    results = response.json()["detail"]["results"]
+    assert [result["status"] for result in results] == ["skipped", "failed"]
+    assert db.query(Expense).filter(Expense.group_id == group.id).count() == 0
+
+
+def _group_with_members(client, auth_headers, db, count):
+    """Create a group through the API with the test user and `count` more members."""
+    from app.models import User
+
+    users = [
+        User(email=f"member{i}@example.com", username=f"member{i}", hashed_password="x")
+        for i in range(count)
+    ]
+    db.add_all(users)
+    db.commit()
+    group_id = client.post("/api/v1/groups", headers=auth_headers, json={"name": "Split"}).json()["id"]
+    client.post(
+        f"/api/v1/groups/{group_id}/members/bulk",
+        headers=auth_headers,
+        json={"emails": [user.email for user in users]},
+    )
+    return group_id, [user.id for user in users]
+
+
+@pytest.mark.parametrize(
+    "method, values, expected",
+    [
+        ("weight", [1, 2, 1], [25.0, 50.0, 25.0]),
+        ("percentage", [50, 30, 20], [50.0, 30.0, 20.0]),
+        ("amount", [10.5, 89.5, 0], [10.5, 89.5, 0.0]),
+        ("equal", [None, None, None], [33.34, 33.33, 33.33]),
+    ],
+)
+def test_create_expense_with_split(client, auth_headers, test_user, db, method, values, expected):
+    """Test expenses split by weight, percentage, fixed amount or equally among participants."""
+    from app.ledger import verify_ledger
+
+    group_id, member_ids = _group_with_members(client, auth_headers, db, 3)
+    participants = [test_user.id] + member_ids[:2]
+
+    response = client.post(
+        "/api/v1/expenses",
+        headers=auth_headers,
+        json={
+            "group_id": group_id,
+            "paid_by_user_id": test_user.id,
+            "amount": 100.0,
+            "split": {
+                "method": method,
+                "participants": [
+                    {"user_id": user_id, "value": value}
+                    for user_id, value in zip(participants, values)
+                ],
+            },
+        },
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = client.get(f"/api/v1/expenses/group/{group_id}/balance", headers=auth_headers)
+    owes = {b["user_id"]: b["total_owes"] for b in response.json()["balances"]}
+    assert [owes[user_id] for user_id in participants] == expected
+    assert owes[member_ids[2]] == 0.0
+    assert verify_ledger(db, group_id) == []
+
+
+def test_create_expense_invalid_split(client, auth_headers, test_user, db):
+    """Test splits that do not fit the expense or the group are rejected."""
+    group_id, _ = _group_with_members(client, auth_headers, db, 1)
+    cases = [
+        (
+            {"method": "amount", "participants": [{"user_id": test_user.id, "value": 60}]},
+            "Split amounts must add up to the expense amount",
+        ),
+        (
+            {"method": "equal", "participants": [{"user_id": test_user.id + 1000}]},
+            "Split participants must be members of the group",
+        ),
+    ]
+
+    for split, detail in cases:
+        response = client.post(
+            "/api/v1/expenses",
+            headers=auth_headers,
+            json={"group_id": group_id, "paid_by_user_id": test_user.id, "amount": 100.0, "split": split},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == detail
+
+
+def test_create_expense_percentages_must_total_100(client, auth_headers, test_user, db):
+    """Test percentage splits are validated with the request."""
+    group_id, _ = _group_with_members(client, auth_headers, db, 1)
+
+    response = client.post(
+        "/api/v1/expenses",
+        headers=auth_headers,
+        json={
+            "group_id": group_id,
+            "paid_by_user_id": test_user.id,
+            "amount": 100.0,
+            "split": {"method": "percentage", "participants": [{"user_id": test_user.id, "value": 90}]},
+        },
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_create_expense_rejects_out_of_range_amounts(client, auth_headers, test_user, db):
+    """Test amounts too large to store in cents are rejected with a validation error."""
+    group_id, _ = _group_with_members(client, auth_headers, db, 1)
+
+    split = {"method": "amount", "participants": [{"user_id": test_user.id, "value": 1e300}]}
+    for amount, split in ((1e300, None), (1e17, None), (float("inf"), None), (100.0, split)):
+        response = client.post(
+            "/api/v1/expenses",
+            headers={**auth_headers, "Content-Type": "application/json"},
+            content=json.dumps({
+                "group_id": group_id, "paid_by_user_id": test_user.id, "amount": amount, "split": split,
+            }),
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_new_member_does_not_change_existing_shares(client, auth_headers, test_user, db):
+    """Test shares are fixed when an expense is created."""
+    from app.models import User
+
+    group_id, member_ids = _group_with_members(client, auth_headers, db, 1)
+    client.post(
+        "/api/v1/expenses",
+        headers=auth_headers,
+        json={"group_id": group_id, "paid_by_user_id": test_user.id, "amount": 90.0},
+    )
+    db.add(User(email="late@example.com", username="late", hashed_password="x"))
+    db.commit()
+    client.post(
+        f"/api/v1/groups/{group_id}/members",
+        headers=auth_headers,
+        json={"email": "late@example.com"},
+    )
+
+    response = client.get(f"/api/v1/expenses/group/{group_id}/balance", headers=auth_headers)
+    nets = [b["net_balance"] for b in response.json()["balances"]]
+    assert nets == [45.0, -45.0, 0.0]
+
+
+def test_group_reads_honour_if_none_match(client, auth_headers, test_user, db):
+    """Test expense history and balances return 304 until an expense is added."""
+    group_id, _ = _group_with_members(client, auth_headers, db, 1)
+    paths = [
+        f"/api/v1/expenses/group/{group_id}",
+        f"/api/v1/expenses/group/{group_id}?format=ndjson",
+        f"/api/v1/expenses/group/{group_id}/balance",
+    ]
+    etags = [client.get(path, headers=auth_headers).headers["ETag"] for path in paths]
+    assert len(set(etags)) == 3
+
+    for path, etag in zip(paths, etags):
+        response = client.get(path, headers={**auth_headers, "If-None-Match": f'W/{etag}, "other"'})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    client.post(
+        "/api/v1/expenses",
+        headers=auth_headers,
+        json={"group_id": group_id, "paid_by_user_id": test_user.id, "amount": 12.0},
+    )
+    for path, etag in zip(paths, etags):
+        response = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
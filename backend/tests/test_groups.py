@@ -175,3 +175,205 @@ def test_add_member_already_member(client, auth_headers, test_user, db):
     )
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
+
+
+def test_group_routes_check_membership_in_one_query(client, auth_headers, test_user, db, query_counter):
+    """Test group-scoped routes resolve the group and membership together."""
+    from app.models import Group, GroupMember
+
+    group = Group(name="Test Group", created_by_user_id=test_user.id)
+    db.add(group)
+    db.commit()
+    db.refresh(group)
+    db.add(GroupMember(group_id=group.id, user_id=test_user.id))
+    db.commit()
+
+    # Backfill the ledger up front; the backfill commits and reloads the group
+    client.get(f"/api/v1/expenses/group/{group.id}/balance", headers=auth_headers)
+
+    for path in (
+        f"/api/v1/groups/{group.id}",
+        f"/api/v1/expenses/group/{group.id}",
+        f"/api/v1/expenses/group/{group.id}/balance",
+        f"/api/v1/expenses/group/{group.id}/settlements",
+    ):
+        query_counter.clear()
+        response = client.get(path, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        membership_checks = [s for s in query_counter if "FROM groups" in s]
+        assert len(membership_checks) == 1
+        assert "group_members" in membership_checks[0]
+
+
+def test_group_routes_group_not_found(client, auth_headers):
+    """Test group-scoped routes return 404 for unknown groups."""
+    for path in (
+        "/api/v1/groups/999",
+        "/api/v1/expenses/group/999",
+        "/api/v1/expenses/group/999/balance",
+    ):
+        response = client.get(path, headers=auth_headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def _add_groups(db, owner, group_count, members_per_group, prefix):
+    """Create groups owned by `owner`, each with extra members."""
+    from app.models import Group, GroupMember, User
+
+    groups = []
+    for g in range(group_count):
+        group = Group(name=f"{prefix} {g}", created_by_user_id=owner.id)
+        db.add(group)
+        db.flush()
+        db.add(GroupMember(group_id=group.id, user_id=owner.id))
+        for m in range(members_per_group):
+            user = User(
+                email=f"{prefix}-{g}-{m}@example.com",
+                username=f"{prefix}-{g}-{m}",
+                hashed_password="x",
+            )
+            db.add(user)
+            db.flush()
+            db.add(GroupMember(group_id=group.id, user_id=user.id))
+        groups.append(group)
+    db.commit()
+    return groups
+
+
+def test_group_listing_query_count_is_constant(client, auth_headers, test_user, db, query_counter):
+    """Test listing groups does not lazy load members or users per row."""
+    def statements_for_listing():
+        client.get("/api/v1/groups", headers=auth_headers)
+        query_counter.clear()
+        response = client.get("/api/v1/groups", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        return len(query_counter), response.json()
+
+    _add_groups(db, test_user, 1, 1, "small")
+    small_count, small_groups = statements_for_listing()
+    _add_groups(db, test_user, 4, 6, "large")
+    large_count, large_groups = statements_for_listing()
+
+    assert len(large_groups) == 5
+    assert all(member["user"]["id"] for g in large_groups for member in g["members"])
+    assert small_count == large_count
+
+
+def test_get_group_query_count_is_constant(client, auth_headers, test_user, db, query_counter):
+    """Test getting a group loads its members and users in fixed statements."""
+    small, large = _add_groups(db, test_user, 1, 1, "small") + _add_groups(db, test_user, 1, 12, "large")
+
+    counts = []
+    for group in (small, large):
+        client.get(f"/api/v1/groups/{group.id}", headers=auth_headers)
+        query_counter.clear()
+        response = client.get(f"/api/v1/groups/{group.id}", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        counts.append(len(query_counter))
+
+    assert len(response.json()["members"]) == 13
+    assert counts[0] == counts[1]
+
+
+def test_add_members_bulk(client, auth_headers, test_user, db):
+    """Test adding many members by email reports an outcome for each email."""
+    from app.ledger import rebuild_group_ledger, verify_ledger
+    from app.models import GroupMember, User
+
+    group = _add_groups(db, test_user, 1, 1, "bulk")[0]
+    rebuild_group_ledger(db, group.id)
+    new_users = [
+        User(email=f"new{i}@example.com", username=f"new{i}", hashed_password="x")
+        for i in range(3)
+    ]
+    db.add_all(new_users)
+    db.commit()
+
+    response = client.post(
+        f"/api/v1/groups/{group.id}/members/bulk",
+        headers=auth_headers,
+        json={
+            "emails": [
+                "new0@example.com",
+                "new1@example.com",
+                "bulk-0-0@example.com",
+                "missing@example.com",
+                "new0@example.com",
+                "new2@example.com",
+            ]
+        },
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    data = response.json()
+    assert data["added"] == 3
+    assert [result["status"] for result in data["results"]] == [
+        "added", "added", "already_member", "not_found", "duplicate", "added"
+    ]
+    assert data["results"][0]["user_id"] == new_users[0].id
+    assert db.query(GroupMember).filter(GroupMember.group_id == group.id).count() == 5
+    assert verify_ledger(db, group.id) == []
+
+
+def test_add_members_bulk_query_count_is_constant(client, auth_headers, test_user, db, query_counter):
+    """Test bulk adds use the same number of statements however many emails are sent."""
+    from app.models import User
+
+    db.add_all(
+        User(email=f"bulk{i}@example.com", username=f"bulk{i}", hashed_password="x")
+        for i in range(40)
+    )
+    db.commit()
+
+    counts = []
+    for emails in (["bulk0@example.com"], [f"bulk{i}@example.com" for i in range(1, 40)]):
+        group = _add_groups(db, test_user, 1, 0, f"target{len(emails)}")[0]
+        client.get(f"/api/v1/groups/{group.id}", headers=auth_headers)
+        query_counter.clear()
+        response = client.post(
+            f"/api/v1/groups/{group.id}/members/bulk",
+            headers=auth_headers,
+            json={"emails": emails},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["added"] == len(emails)
+        counts.append(len(query_counter))
+
+    assert counts[0] == counts[1]
+
+
+def test_get_group_conditional(client, auth_headers, test_user, db, query_counter):
+    """Test group reads return 304 for a current ETag from a single query."""
+    from app.models import User
+
+    group_id = client.post("/api/v1/groups", headers=auth_headers, json={"name": "Polling"}).json()["id"]
+    response = client.get(f"/api/v1/groups/{group_id}", headers=auth_headers)
+    etag = response.headers["ETag"]
+    assert etag.startswith('"')
+
+    query_counter.clear()
+    response = client.get(
+        f"/api/v1/groups/{group_id}",
+        headers={**auth_headers, "If-None-Match": etag},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert len(query_counter) == 1
+
+    # Adding a member changes the version
+    db.add(User(email="joiner@example.com", username="joiner", hashed_password="x"))
+    db.commit()
+    client.post(f"/api/v1/groups/{group_id}/members", headers=auth_headers, json={"email": "joiner@example.com"})
+    response = client.get(f"/api/v1/groups/{group_id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["members"]) == 2
+    etag = response.headers["ETag"]
+
+    # So does a member renaming themselves
+    client.put(
+        "/api/v1/users/me",
+        headers=auth_headers,
+        json={"email": "test@example.com", "username": "renamed"},
+    )
+    response = client.get(f"/api/v1/groups/{group_id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
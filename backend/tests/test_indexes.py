@@ -0,0 +1,95 @@
+"""Tests for hot path indexes and their migration."""
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.migrations import apply_migrations
+
+
+def _query_plan(db, sql, **params):
+    """Return SQLite's query plan for a statement as one string."""
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+def test_membership_lookup_uses_index(db):
+    """Test membership checks search the (group_id, user_id) index."""
+    plan = _query_plan(
+        db,
+        "SELECT id FROM group_members WHERE group_id = :group_id AND user_id = :user_id",
+        group_id=1,
+        user_id=1,
+    )
+    assert "ix_group_members_group_user" in plan
+
+
+def test_user_groups_lookup_uses_index(db):
+    """Test listing a user's groups searches the user_id index."""
+    plan = _query_plan(
+        db,
+        "SELECT group_id FROM group_members WHERE user_id = :user_id",
+        user_id=1,
+    )
+    assert "ix_group_members_user_group" in plan
+
+
+def test_expense_history_uses_index_for_order(db):
+    """Test expense history is read in index order without a sort."""
+    plan = _query_plan(
+        db,
+        "SELECT id FROM expenses WHERE group_id = :group_id "
+        "ORDER BY created_at DESC, id DESC",
+        group_id=1,
+    )
+    assert "ix_expenses_group_created" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_migration_adds_indexes_to_existing_database():
+    """Test indexes are added to an existing schema and duplicates removed before shares are recorded."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # Simulate a database created before the indexes existed
+        for name in (
+            "ix_group_members_group_user",
+            "ix_group_members_user_group",
+            "ix_expenses_group_created",
+        ):
+            conn.execute(text(f"DROP INDEX {name}"))
+        # ... and before amounts were stored in cents
+        conn.execute(text("ALTER TABLE expenses ADD COLUMN amount FLOAT"))
+        conn.execute(text("ALTER TABLE expenses DROP COLUMN amount_cents"))
+        conn.execute(text(
+            "INSERT INTO users (id, email, username, hashed_password) "
+            "VALUES (1, 'a@example.com', 'a', 'x')"
+        ))
+        conn.execute(text(
+            "INSERT INTO groups (id, name, created_by_user_id) VALUES (1, 'g', 1)"
+        ))
+        conn.execute(text(
+            "INSERT INTO group_members (group_id, user_id) VALUES (1, 1), (1, 1)"
+        ))
+        conn.execute(text(
+            "INSERT INTO expenses (group_id, paid_by_user_id, amount) VALUES (1, 1, 12.5)"
+        ))
+
+    applied = apply_migrations(engine)
+    assert {
+        "group_members duplicates",
+        "expenses.amount_cents",
+        "expense_shares",
+        "ix_group_members_group_user",
+        "ix_group_members_user_group",
+        "ix_expenses_group_created",
+    } <= set(applied)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM group_members")).scalar() == 1
+        assert conn.execute(
+            text("SELECT user_id, share_cents FROM expense_shares")
+        ).all() == [(1, 1250)]
+    assert apply_migrations(engine) == []
@@ -0,0 +1,237 @@
+"""Tests for the group balance ledger."""
+import pytest
+from fastapi import status
+
+from app.ledger import rebuild_ledger, verify_ledger
+
+
+def _create_group_with_member(client, auth_headers, db):
+    """Create a group through the API and add a second member."""
+    from app.models import User
+    from app.auth import get_password_hash
+
+    other_user = User(
+        email="other@example.com",
+        username="otheruser",
+        hashed_password=get_password_hash("password123"),
+    )
+    db.add(other_user)
+    db.commit()
+    db.refresh(other_user)
+
+    response = client.post(
+        "/api/v1/groups",
+        headers=auth_headers,
+        json={"name": "Ledger Group"},
+    )
+    group_id = response.json()["id"]
+    client.post(
+        f"/api/v1/groups/{group_id}/members",
+        headers=auth_headers,
+        json={"email": "other@example.com"},
+    )
+    return group_id, other_user
+
+
+def test_ledger_tracks_expenses_and_members(client, auth_headers, test_user, db):
+    """Test the ledger follows expense creation and member additions."""
+    group_id, other_user = _create_group_with_member(client, auth_headers, db)
+
+    response = client.post(
+        "/api/v1/expenses",
+        headers=auth_headers,
+        json={"group_id": group_id, "paid_by_user_id": test_user.id, "amount": 90.0},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert verify_ledger(db, group_id) == []
+
+    response = client.get(
+        f"/api/v1/expenses/group/{group_id}/balance",
+        headers=auth_headers,
+    )
+    balances = {b["user_id"]: b for b in response.json()["balances"]}
+    assert balances[test_user.id]["net_balance"] == 45.0
+    assert balances[other_user.id]["net_balance"] == -45.0
+
+
+def test_verify_and_rebuild_ledger(client, auth_headers, test_user, db):
+    """Test drift from out-of-band writes is detected and repaired."""
+    from app.models import Expense
+
+    group_id, other_user = _create_group_with_member(client, auth_headers, db)
+
+    # Bypass the API so the ledger is not updated
+    db.add(Expense(group_id=group_id, paid_by_user_id=other_user.id, amount=40.0))
+    db.commit()
+
+    drift = verify_ledger(db, group_id)
+    assert {(d.user_id, d.field) for d in drift} == {(other_user.id, "paid_cents")}
+
+    # Rebuilding also records equal shares for the expense
+    assert rebuild_ledger(db, group_id) == 2
+    assert verify_ledger(db) == []
+    response = client.get(f"/api/v1/expenses/group/{group_id}/balance", headers=auth_headers)
+    balances = {b["user_id"]: b["net_balance"] for b in response.json()["balances"]}
+    assert balances == {test_user.id: -20.0, other_user.id: 20.0}
+
+
+def test_balance_computes_missing_ledger_without_writing(client, auth_headers, test_user, db, query_counter):
+    """Test groups without ledger entries are computed from history and not written on read."""
+    from app.models import Group, GroupMember, GroupBalance, Expense
+
+    group = Group(name="Legacy Group", created_by_user_id=test_user.id)
+    db.add(group)
+    db.commit()
+    db.refresh(group)
+    db.add(GroupMember(group_id=group.id, user_id=test_user.id))
+    db.add(Expense(group_id=group.id, paid_by_user_id=test_user.id, amount=25.0))
+    db.commit()
+
+    query_counter.clear()
+    response = client.get(
+        f"/api/v1/expenses/group/{group.id}/balance",
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["balances"][0]["total_owed"] == 25.0
+    assert response.json()["balances"][0]["total_owes"] == 25.0
+    assert not [s for s in query_counter if s.startswith(("INSERT", "UPDATE", "DELETE"))]
+    assert db.query(GroupBalance).filter(GroupBalance.group_id == group.id).count() == 0
+
+
+def test_migration_fills_missing_ledger_entries(test_user, db):
+    """Test the startup migration writes ledger entries for members that have none."""
+    from app.migrations import fill_missing_ledger_entries
+    from app.models import Group, GroupMember, GroupBalance, Expense
+
+    group = Group(name="Legacy Group", created_by_user_id=test_user.id)
+    db.add(group)
+    db.flush()
+    db.add(GroupMember(group_id=group.id, user_id=test_user.id))
+    db.add(Expense(group_id=group.id, paid_by_user_id=test_user.id, amount=25.0))
+    db.commit()
+
+    assert fill_missing_ledger_entries(db.get_bind()) == ["group_balances entries"]
+    entry = db.query(GroupBalance).filter(GroupBalance.group_id == group.id).one()
+    assert (entry.paid_cents, entry.share_cents) == (2500, 2500)
+    assert fill_missing_ledger_entries(db.get_bind()) == []
+
+
+def test_aggregate_balances_matches_expense_history(test_user, db):
+    """Test expenses without recorded shares are split equally, handing out remainder cents."""
+    from app.models import Group, GroupMember, Expense, User
+    from app.ledger import aggregate_balances, backfill_expense_shares
+
+    users = [test_user]
+    for i in range(2):
+        user = User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="x")
+        db.add(user)
+        users.append(user)
+    db.commit()
+
+    group = Group(name="Trip", created_by_user_id=test_user.id)
+    empty_group = Group(name="Empty", created_by_user_id=test_user.id)
+    db.add_all([group, empty_group])
+    db.commit()
+    for user in users:
+        db.add(GroupMember(group_id=group.id, user_id=user.id))
+    db.add(GroupMember(group_id=empty_group.id, user_id=test_user.id))
+    db.flush()
+    amounts = [(users[0], 30.0), (users[1], 12.5), (users[0], 7.5)]
+    for payer, amount in amounts:
+        db.add(Expense(group_id=group.id, paid_by_user_id=payer.id, amount=amount))
+    db.commit()
+
+    assert backfill_expense_shares(db) == 3
+    balances = aggregate_balances(db)
+    assert balances[(group.id, users[0].id)] == (3750, 1667)
+    assert balances[(group.id, users[1].id)] == (1250, 1667)
+    assert balances[(group.id, users[2].id)] == (0, 1666)
+    assert balances[(empty_group.id, test_user.id)] == (0, 0)
+
+
+def test_balances_sum_to_zero_over_long_history(client, auth_headers, test_user, db):
+    """Test amounts that do not split evenly never leave the group off by a cent."""
+    group_id, other_user = _create_group_with_member(client, auth_headers, db)
+    client.post(
+        "/api/v1/expenses/batch",
+        headers=auth_headers,
+        json={
+            "group_id": group_id,
+            "expenses": [
+                {"paid_by_user_id": test_user.id, "amount": 0.1},
+                {"paid_by_user_id": other_user.id, "amount": 0.2},
+                {"paid_by_user_id": test_user.id, "amount": 33.33},
+            ] * 100,
+        },
+    )
+    client.post(
+        "/api/v1/expenses",
+        headers=auth_headers,
+        json={"group_id": group_id, "paid_by_user_id": test_user.id, "amount": 0.01},
+    )
+
+    response = client.get(f"/api/v1/expenses/group/{group_id}/balance", headers=auth_headers)
+    balances = response.json()["balances"]
+    assert sum(round(b["net_balance"] * 100) for b in balances) == 0
+    assert sum(b["total_owes"] for b in balances) == pytest.approx(3363.01)
+    assert verify_ledger(db, group_id) == []
+
+
+def test_migration_converts_float_amounts_to_cents(tmp_path):
+    """Test databases with float amounts are migrated to integer cents."""
+    from sqlalchemy import create_engine, inspect, text
+    from sqlalchemy.orm import Session
+
+    from app.database import Base
+    from app.migrations import apply_migrations
+    from app.models import Expense, GroupBalance
+
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE expenses (id INTEGER PRIMARY KEY, group_id INTEGER NOT NULL, paid_by_user_id INTEGER NOT NULL, amount FLOAT NOT NULL, description VARCHAR, expense_metadata VARCHAR, created_at DATETIME)"))
+        conn.execute(text("CREATE TABLE group_balances (id INTEGER PRIMARY KEY, group_id INTEGER NOT NULL, user_id INTEGER NOT NULL, total_paid FLOAT NOT NULL, total_share FLOAT NOT NULL, updated_at DATETIME)"))
+        conn.execute(text("INSERT INTO expenses (group_id, paid_by_user_id, amount) VALUES (1, 1, 10.1), (1, 2, 0.29)"))
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO group_members (group_id, user_id) VALUES (1, 1), (1, 2)"))
+
+    changes = apply_migrations(engine)
+    assert "expenses.amount_cents" in changes
+    assert "amount" not in {c["name"] for c in inspect(engine).get_columns("expenses")}
+    with Session(engine) as db:
+        assert [e.amount_cents for e in db.query(Expense).order_by(Expense.id)] == [1010, 29]
+        assert {(b.user_id, b.paid_cents, b.share_cents) for b in db.query(GroupBalance)} == {
+            (1, 1010, 520),
+            (2, 29, 519),
+        }
+    assert apply_migrations(engine) == []
+
+
+def test_backfill_splits_among_members_present_at_the_time(test_user, db):
+    """Test legacy expenses are only shared by members who had joined when they were created."""
+    from datetime import datetime, timedelta
+    from app.models import Group, GroupMember, Expense, User
+    from app.ledger import backfill_expense_shares, compute_group_balances
+
+    start = datetime(2024, 1, 1)
+    late_user = User(email="late@example.com", username="late", hashed_password="x")
+    db.add(late_user)
+    group = Group(name="History", created_by_user_id=test_user.id)
+    db.add(group)
+    db.flush()
+    db.add_all([
+        GroupMember(group_id=group.id, user_id=test_user.id, joined_at=start),
+        GroupMember(group_id=group.id, user_id=late_user.id, joined_at=start + timedelta(days=2)),
+        Expense(group_id=group.id, paid_by_user_id=test_user.id, amount=60.0, created_at=start + timedelta(days=1)),
+        Expense(group_id=group.id, paid_by_user_id=test_user.id, amount=10.01, created_at=start + timedelta(days=3)),
+        Expense(group_id=group.id, paid_by_user_id=late_user.id, amount=5.0, created_at=start + timedelta(days=2)),
+    ])
+    db.commit()
+
+    assert backfill_expense_shares(db, group.id) == 3
+    assert compute_group_balances(db, group.id) == {
+        test_user.id: (7001, 6000 + 501 + 250),
+        late_user.id: (500, 500 + 250),
+    }
+    assert backfill_expense_shares(db, group.id) == 0
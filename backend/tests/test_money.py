@@ -0,0 +1,42 @@
+"""Tests for integer-cent money helpers."""
+import pytest
+
+from app.money import from_cents, split_cents, split_weighted, to_cents
+
+
+def test_to_cents_rounds_half_up():
+    """Test float amounts convert to exact cents."""
+    assert to_cents(0.1) == 10
+    assert to_cents(100.50) == 10050
+    assert to_cents(1.005) == 101
+    assert to_cents(0.004) == 0
+    assert from_cents(10050) == 100.5
+
+
+def test_to_cents_rejects_non_finite_amounts():
+    """Test amounts without a whole number of cents raise ValueError."""
+    for amount in (float("inf"), float("-inf"), float("nan")):
+        with pytest.raises(ValueError):
+            to_cents(amount)
+
+
+def test_split_cents_hands_out_remainder():
+    """Test shares differ by at most a cent and always sum to the total."""
+    assert split_cents(1000, 3) == [334, 333, 333]
+    assert split_cents(2, 3) == [1, 1, 0]
+    assert split_cents(900, 3) == [300, 300, 300]
+    assert split_cents(100, 0) == []
+    for total in range(0, 200):
+        for parts in range(1, 8):
+            shares = split_cents(total, parts)
+            assert sum(shares) == total
+            assert max(shares) - min(shares) <= 1
+
+
+def test_split_weighted_uses_largest_remainder():
+    """Test weighted shares follow the weights and always sum to the total."""
+    assert split_weighted(1000, [1, 1, 1]) == [334, 333, 333]
+    assert split_weighted(10000, [50, 30, 20]) == [5000, 3000, 2000]
+    assert split_weighted(101, [1, 2]) == [34, 67]
+    assert split_weighted(5, [0.1, 0.2, 0.7]) == [1, 1, 3]
+    assert split_weighted(100, [0, 0]) == [0, 0]
@@ -0,0 +1,50 @@
+"""Tests for settlement planning."""
+import random
+
+import pytest
+
+from app.settlement import exact_settlements, greedy_settlements
+
+
+def _apply(net_cents, transfers):
+    """Apply transfers to balances and return what is left."""
+    remaining = dict(net_cents)
+    for transfer in transfers:
+        assert transfer.amount_cents > 0
+        remaining[transfer.from_user_id] += transfer.amount_cents
+        remaining[transfer.to_user_id] -= transfer.amount_cents
+    return remaining
+
+
+@pytest.mark.parametrize("plan", [greedy_settlements, exact_settlements])
+def test_plans_settle_all_balances(plan):
+    """Test every plan leaves all members settled."""
+    rng = random.Random(42)
+    for _ in range(50):
+        net_cents = {user_id: rng.randint(-5000, 5000) for user_id in range(1, 9)}
+        net_cents[9] = -sum(net_cents.values())
+        transfers = plan(net_cents)
+        assert len(transfers) <= len(net_cents) - 1
+        assert all(cents == 0 for cents in _apply(net_cents, transfers).values())
+
+
+def test_exact_finds_fewer_transfers_than_greedy():
+    """Test the exact solver uses independent zero-sum subgroups."""
+    net_cents = {1: 500, 2: 400, 3: -400, 4: -300, 5: -200}
+    # {1: 500, 4: -300, 5: -200} and {2: 400, 3: -400} settle separately
+    assert len(exact_settlements(net_cents)) == 3
+    assert len(greedy_settlements(net_cents)) == 4
+
+
+def test_rounding_residue_is_absorbed():
+    """Test balances that do not sum to zero still settle cleanly."""
+    net_cents = {1: 6667, 2: -3333, 3: -3333}
+    transfers = greedy_settlements(net_cents)
+    assert sum(t.amount_cents for t in transfers) == 6666
+
+
+def test_exact_rejects_large_groups():
+    """Test the exact solver refuses inputs it cannot solve quickly."""
+    net_cents = {user_id: 100 if user_id % 2 else -100 for user_id in range(40)}
+    with pytest.raises(ValueError):
+        exact_settlements(net_cents)
@@ -0,0 +1,156 @@
+"""Tests for the SQLite performance profile."""
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.orm import sessionmaker
+
+from app.sqlite_profile import BEGIN_MODE_OPTION, configure_sqlite
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """A file SQLite engine with the profile applied and a one-column table."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/profile.db", connect_args={"check_same_thread": False}
+    )
+    configure_sqlite(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+    yield engine
+    engine.dispose()
+
+
+def test_pragmas_are_applied(sqlite_engine):
+    """Test new connections use WAL and the configured pragmas."""
+    from app.config import settings
+
+    with sqlite_engine.connect() as conn:
+        def pragma(name):
+            return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == settings.sqlite_busy_timeout_ms
+        assert pragma("cache_size") == -settings.sqlite_cache_size_kib
+        assert pragma("temp_store") == 2  # MEMORY
+
+
+def test_write_transaction_begins_immediate(sqlite_engine):
+    """Test write sessions start with BEGIN IMMEDIATE and other sessions with BEGIN."""
+    from app.database import write_transaction
+
+    statements = []
+    event.listen(
+        sqlite_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    Session = sessionmaker(bind=sqlite_engine)
+
+    with Session() as db:
+        write_transaction(db)
+        db.execute(text("INSERT INTO items DEFAULT VALUES"))
+        db.commit()
+    with Session() as db:
+        db.execute(text("SELECT COUNT(*) FROM items"))
+
+    assert [s for s in statements if s.startswith("BEGIN")] == ["BEGIN IMMEDIATE", "BEGIN"]
+
+
+def test_immediate_writers_wait_instead_of_failing(sqlite_engine):
+    """Test a writer that read first fails on a stale snapshot, while BEGIN IMMEDIATE waits."""
+    holder = sqlite_engine.connect()
+    holder.execution_options(**{BEGIN_MODE_OPTION: "IMMEDIATE"}).begin()
+    holder.execute(text("INSERT INTO items DEFAULT VALUES"))
+
+    # Deferred: reads before the other writer commits, then cannot write
+    with sqlite_engine.connect() as deferred:
+        deferred.begin()
+        deferred.execute(text("SELECT COUNT(*) FROM items"))
+        holder.commit()
+        with pytest.raises(exc.OperationalError, match="locked"):
+            deferred.execute(text("INSERT INTO items DEFAULT VALUES"))
+
+    # Immediate: queues for the write lock and succeeds once it is released
+    holder.begin()
+    holder.execute(text("INSERT INTO items DEFAULT VALUES"))
+    errors = []
+
+    def write():
+        try:
+            with sqlite_engine.connect() as conn:
+                conn = conn.execution_options(**{BEGIN_MODE_OPTION: "IMMEDIATE"})
+                with conn.begin():
+                    conn.execute(text("SELECT COUNT(*) FROM items"))
+                    conn.execute(text("INSERT INTO items DEFAULT VALUES"))
+        except exc.OperationalError as error:
+            errors.append(error)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    time.sleep(0.1)
+    holder.commit()
+    holder.close()
+    writer.join()
+
+    assert errors == []
+    with sqlite_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM items")).scalar() == 3
+
+
+def test_write_routes_begin_immediate(tmp_path):
+    """Test every transaction of signup and group creation that writes starts with BEGIN IMMEDIATE."""
+    from fastapi.testclient import TestClient
+
+    from app.auth import principal_cache
+    from app.database import Base, get_db
+    from app.main import app
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/routes.db", connect_args={"check_same_thread": False}
+    )
+    configure_sqlite(engine)
+    Base.metadata.create_all(bind=engine)
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    Session = sessionmaker(bind=engine)
+
+    def override_get_db():
+        with Session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    principal_cache.clear()
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/v1/auth/signup", json={
+                "email": "writer@example.com", "username": "writer", "password": "writerpassword",
+            })
+            assert response.status_code == 201
+            token = client.post("/api/v1/auth/login", json={
+                "email": "writer@example.com", "password": "writerpassword",
+            }).json()["access_token"]
+            response = client.post(
+                "/api/v1/groups", headers={"Authorization": f"Bearer {token}"}, json={"name": "Trip"}
+            )
+            assert response.status_code == 201
+    finally:
+        app.dependency_overrides.clear()
+        principal_cache.clear()
+        engine.dispose()
+
+    transactions = []
+    for statement in statements:
+        if statement.startswith("BEGIN"):
+            transactions.append([])
+        if transactions:
+            transactions[-1].append(statement)
+    writes = [t for t in transactions if any(s.startswith(("INSERT", "UPDATE")) for s in t)]
+    assert len(writes) == 2
+    assert all(transaction[0] == "BEGIN IMMEDIATE" for transaction in writes)
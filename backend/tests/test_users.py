@@ -70,3 +70,57 @@ def test_get_user_not_found(client, auth_headers):
     response = client.get("/api/v1/users/99999", headers=auth_headers)
     assert response.status_code == status.HTTP_404_NOT_FOUND
 
+
+
+def test_get_my_balances_across_groups(client, auth_headers, test_user, db, query_counter):
+    """Test the caller's net position across all groups comes from one ledger query."""
+    from app.migrations import fill_missing_ledger_entries
+    from app.models import Group, GroupMember, Expense, User
+
+    other = User(email="friend@example.com", username="friend", hashed_password="x")
+    db.add(other)
+    db.commit()
+    group_ids = []
+    for name in ("Trip", "Flat"):
+        response = client.post("/api/v1/groups", headers=auth_headers, json={"name": name})
+        group_ids.append(response.json()["id"])
+        client.post(
+            f"/api/v1/groups/{group_ids[-1]}/members",
+            headers=auth_headers,
+            json={"email": "friend@example.com"},
+        )
+    client.post(
+        "/api/v1/expenses",
+        headers=auth_headers,
+        json={"group_id": group_ids[0], "paid_by_user_id": test_user.id, "amount": 100.0},
+    )
+    client.post(
+        "/api/v1/expenses",
+        headers=auth_headers,
+        json={"group_id": group_ids[1], "paid_by_user_id": other.id, "amount": 30.0},
+    )
+
+    # A legacy group without ledger entries is computed from history, without writing
+    legacy = Group(name="Legacy", created_by_user_id=test_user.id)
+    db.add(legacy)
+    db.flush()
+    db.add(GroupMember(group_id=legacy.id, user_id=test_user.id))
+    db.flush()
+    db.add(Expense(group_id=legacy.id, paid_by_user_id=test_user.id, amount=5.0))
+    db.commit()
+    query_counter.clear()
+    response = client.get("/api/v1/users/me/balances", headers=auth_headers)
+    assert [g["net_balance"] for g in response.json()["groups"]] == [50.0, -15.0, 0.0]
+    assert not [s for s in query_counter if s.startswith(("INSERT", "UPDATE", "DELETE"))]
+
+    # Once the startup migration has filled in its entries, one query serves every group
+    fill_missing_ledger_entries(db.get_bind())
+    query_counter.clear()
+    response = client.get("/api/v1/users/me/balances", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [g["net_balance"] for g in data["groups"]] == [50.0, -15.0, 0.0]
+    assert data["total_owed"] == 105.0
+    assert data["total_owes"] == 70.0
+    assert data["net_balance"] == 35.0
+    assert len(query_counter) == 1